@@ -0,0 +1,119 @@
+"""Условные GET-запросы (If-None-Match / If-Modified-Since).
+
+Версия коллекции — наибольшее `updated_at` и число объектов: добавление
+и изменение увеличивают первое, удаление меняет второе. Версия
+считается одним агрегирующим запросом по индексу, и если клиент уже
+получил эту версию, ответ 304 отдаётся без сериализации страницы.
+"""
+import hashlib
+from urllib.parse import urlencode
+
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+
+def make_etag(request, *version):
+    query = urlencode(sorted(
+        (name, value)
+        for name, values in request.GET.lists() for value in values
+    ))
+    source = '\n'.join((
+        request.path,
+        query,
+        request.META.get('HTTP_ACCEPT', ''),
+        *(str(part) for part in version),
+    ))
+    return '"{}"'.format(
+        hashlib.blake2b(source.encode(), digest_size=16).hexdigest())
+
+
+def set_validators(response, etag, last_modified):
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified.timestamp())
+    return response
+
+
+class ConditionalGetMixin:
+    """Отвечает 304 на list и retrieve, если данные не изменились.
+
+    Вьюсет может переопределить `get_version_queryset`: версия должна
+    считаться без лишних запросов, например без проверки существования
+    родительского объекта. Пустая коллекция или отсутствующий объект
+    обрабатываются как обычно, чтобы 404 отдавал основной код;
+    `collection_found` показывает, нашлись ли объекты. Число объектов
+    из версии передаётся пагинации как `collection_count`.
+
+    Курсорная страница не считает всю коллекцию: её версия — объекты
+    самой страницы, которые всё равно выбираются одним запросом.
+    """
+    version_field = 'updated_at'
+    collection_count = None
+    collection_found = False
+
+    def get_version_queryset(self):
+        return self.filter_queryset(self.get_queryset())
+
+    def is_cursor_request(self, request):
+        cursor_param = getattr(self.paginator, 'cursor_query_param', None)
+        return cursor_param is not None and cursor_param in request.GET
+
+    def list(self, request, *args, **kwargs):
+        if self.is_cursor_request(request):
+            return self.cursor_list(request, *args, **kwargs)
+        version = self.get_version_queryset().aggregate(
+            last_modified=Max(self.version_field), count=Count('pk'))
+        if not version['count']:
+            return super().list(request, *args, **kwargs)
+        self.collection_found = True
+        self.collection_count = version['count']
+        return self.conditional_response(
+            request, version['last_modified'], version['count'],
+            super().list, args, kwargs)
+
+    def cursor_list(self, request, *args, **kwargs):
+        page = self.paginate_queryset(
+            self.filter_queryset(self.get_queryset()))
+
+        def render_page(request, *args, **kwargs):
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
+        if not page:
+            return render_page(request)
+        self.collection_found = True
+        # Ссылка на следующую страницу зависит от того, есть ли она.
+        page_version = ','.join(str(obj.pk) for obj in page) + (
+            f';{self.paginator.get_next_link()}')
+        return self.conditional_response(
+            request, max(getattr(obj, self.version_field) for obj in page),
+            page_version, render_page, args, kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            last_modified = self.get_version_queryset().filter(
+                **{self.lookup_field: kwargs[lookup_url_kwarg]}
+            ).values_list('updated_at', flat=True).first()
+        except (TypeError, ValueError, ValidationError):
+            # Некорректный идентификатор: 404 отдаст get_object.
+            last_modified = None
+        if last_modified is None:
+            return super().retrieve(request, *args, **kwargs)
+        return self.conditional_response(
+            request, last_modified, None, super().retrieve, args, kwargs)
+
+    def conditional_response(self, request, last_modified, version,
+                             get_response, args, kwargs):
+        etag = make_etag(request, last_modified.isoformat(), version)
+        not_modified = get_conditional_response(
+            request, etag=etag, last_modified=int(last_modified.timestamp()))
+        if not_modified is not None:
+            if not_modified.status_code == 304:
+                set_validators(not_modified, etag, last_modified)
+            return not_modified
+        response = get_response(request, *args, **kwargs)
+        if response.status_code == 200:
+            set_validators(response, etag, last_modified)
+        return response
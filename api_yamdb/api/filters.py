@@ -1,18 +1,133 @@
 import django_filters
+from rest_framework.filters import OrderingFilter, SearchFilter
+
 from reviews.models import Title
+from reviews.search import normalize_search_text
+
+# Верхняя граница диапазона для поиска по префиксу.
+PREFIX_UPPER_BOUND = '\U0010ffff'
+
+
+class CharInFilter(django_filters.BaseInFilter, django_filters.CharFilter):
+    """Несколько значений через запятую: `?genre=drama,comedy`."""
 
 
 class TitlesFilter(django_filters.FilterSet):
+    GENRE_MODE_ANY = 'any'
+    GENRE_MODE_ALL = 'all'
+
     name = django_filters.CharFilter(
         field_name='name', lookup_expr='icontains'
     )
-    category = django_filters.CharFilter(
-        field_name='category__slug'
+    category = CharInFilter(
+        field_name='category__slug', lookup_expr='in'
+    )
+    genre = CharInFilter(method='filter_genre')
+    genre_mode = django_filters.ChoiceFilter(
+        choices=(
+            (GENRE_MODE_ANY, 'Хотя бы один из жанров'),
+            (GENRE_MODE_ALL, 'Все жанры'),
+        ),
+        method='filter_genre_mode',
     )
-    genre = django_filters.CharFilter(
-        field_name='genre__slug'
+    year_min = django_filters.NumberFilter(
+        field_name='year', lookup_expr='gte'
     )
+    year_max = django_filters.NumberFilter(
+        field_name='year', lookup_expr='lte'
+    )
+    rating_min = django_filters.NumberFilter(
+        field_name='rating', lookup_expr='gte'
+    )
+    rating_max = django_filters.NumberFilter(
+        field_name='rating', lookup_expr='lte'
+    )
+    search = django_filters.CharFilter(method='filter_search')
 
     class Meta:
         model = Title
-        fields = ('name', 'year', 'genre', 'category')
+        fields = ('name', 'year', 'genre', 'category', 'search')
+
+    def filter_genre(self, queryset, name, value):
+        """Произведения с жанрами из списка.
+
+        Каждый список жанров — полусоединение: id произведений берутся
+        подзапросом из индекса (genre_id, title_id) промежуточной
+        таблицы, поэтому строки не дублируются и DISTINCT не нужен.
+        В режиме `all` на каждый жанр накладывается отдельное условие.
+        """
+        slugs = list(dict.fromkeys(value))
+        if self.form.cleaned_data.get('genre_mode') == self.GENRE_MODE_ALL:
+            groups = [[slug] for slug in slugs]
+        else:
+            groups = [slugs]
+        links = Title.genre.through.objects
+        for group in groups:
+            queryset = queryset.filter(pk__in=links.filter(
+                genre__slug__in=group).values('title_id'))
+        return queryset
+
+    def filter_genre_mode(self, queryset, name, value):
+        # Режим читает filter_genre.
+        return queryset
+
+    def filter_search(self, queryset, name, value):
+        return queryset.search(value)
+
+
+class SearchKeyFilter(SearchFilter):
+    """Поиск по префиксу нормализованного ключа.
+
+    Вместо LIKE по `search_fields` фильтрует диапазоном по индексированному
+    полю `search_key_field` вьюсета, поэтому поиск не зависит от регистра
+    и буквы ё в том числе для кириллицы.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        key_field = getattr(view, 'search_key_field', None)
+        value = request.query_params.get(self.search_param, '')
+        prefix = ' '.join(normalize_search_text(value).split())
+        if key_field is None or not prefix:
+            return queryset
+        return queryset.filter(**{
+            f'{key_field}__gte': prefix,
+            f'{key_field}__lt': prefix + PREFIX_UPPER_BOUND,
+        })
+
+
+class StableOrderingFilter(OrderingFilter):
+    """Сортировка `?ordering=` с однозначным порядком страниц.
+
+    К выбранным полям добавляется первичный ключ в направлении
+    последнего поля: равные значения не перемешиваются между страницами,
+    а индекс (поле, id) читается в одну сторону. Без параметра порядок,
+    заданный раньше (например, релевантность поиска), сохраняется,
+    иначе используется `ordering` вьюсета. Параметр, в котором нет
+    ни одного допустимого поля, считается отсутствующим.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        ordering = self.get_user_ordering(request, queryset, view)
+        if not ordering:
+            if queryset.query.order_by:
+                return queryset
+            ordering = self.get_default_ordering(view)
+        if not ordering:
+            return queryset
+        return queryset.order_by(*with_tie_break(ordering))
+
+    def get_user_ordering(self, request, queryset, view):
+        """Вернуть допустимые поля из `?ordering=` или пустой список."""
+        params = request.query_params.get(self.ordering_param)
+        if not params:
+            return []
+        fields = [param.strip() for param in params.split(',')]
+        return self.remove_invalid_fields(queryset, fields, view, request)
+
+
+def with_tie_break(ordering):
+    fields = [name.lstrip('-') for name in ordering]
+    if 'id' in fields or 'pk' in fields:
+        return ordering
+    direction = '-' if ordering[-1].startswith('-') else ''
+    return (*ordering, f'{direction}id')
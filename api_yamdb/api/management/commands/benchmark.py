@@ -0,0 +1,329 @@
+import json
+import time
+from collections import namedtuple
+from itertools import count
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.tokens import default_token_generator
+from django.core.management import BaseCommand, CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.urls import router_v1
+from reviews.management.commands.generate_data import generate_data
+from reviews.models import Category, Comment, Genre, Review, Title
+from users.models import User
+
+SIZES = (100, 1000, 10000)
+REPEAT = 20
+WARMUP = 2
+THRESHOLD = 0.2
+
+Scenario = namedtuple(
+    'Scenario', 'name basename method client path data status')
+
+
+class BenchmarkData:
+    """Объекты засеянной базы, к которым обращаются сценарии."""
+
+    def __init__(self):
+        self.admin = User.objects.create(
+            username='bench-admin', email='bench-admin@yamdb.fake',
+            role=User.ADMIN)
+        self.user = User.objects.create(
+            username='bench-user', email='bench-user@yamdb.fake')
+        # Самое популярное произведение и самый обсуждаемый отзыв.
+        self.title = Title.objects.order_by('-reviews_count', 'pk').first()
+        self.review = (
+            self.title.reviews.order_by('pk').first()
+            or Review.objects.create(
+                title=self.title, author=self.admin, text='Отзыв', score=5))
+        self.comment = (
+            self.review.comments.order_by('pk').first()
+            or Comment.objects.create(
+                review=self.review, author=self.admin, text='Комментарий'))
+        self.genre = Genre.objects.order_by('pk').first()
+        self.category = Category.objects.order_by('pk').first()
+        self.title_ids = iter(
+            Title.objects.order_by('pk').values_list('pk', flat=True))
+        self.sequence = count(1)
+
+    def fresh(self):
+        return next(self.sequence)
+
+    def next_title_id(self):
+        return next(self.title_ids)
+
+    def confirmation_code(self):
+        return default_token_generator.make_token(self.user)
+
+
+def new_user(data):
+    number = data.fresh()
+    return {'username': f'bench{number}', 'email': f'bench{number}@yamdb.fake'}
+
+
+TITLES = '/api/v1/titles/'
+REVIEWS = '/api/v1/titles/{d.title.pk}/reviews/'
+COMMENTS = REVIEWS + '{d.review.pk}/comments/'
+
+# path (шаблон или функция) и data вычисляются перед каждым запросом
+# от BenchmarkData `d`.
+SCENARIOS = (
+    Scenario('users-list', 'users', 'get', 'admin',
+             '/api/v1/users/', None, 200),
+    Scenario('users-search', 'users', 'get', 'admin',
+             '/api/v1/users/?search=user1', None, 200),
+    Scenario('users-detail', 'users', 'get', 'admin',
+             '/api/v1/users/{d.user.username}/', None, 200),
+    Scenario('users-me', 'users', 'get', 'user',
+             '/api/v1/users/me/', None, 200),
+    Scenario('users-create', 'users', 'post', 'admin',
+             '/api/v1/users/', new_user, 201),
+    Scenario('genres-list', 'genres', 'get', 'anon',
+             '/api/v1/genres/', None, 200),
+    Scenario('genres-search', 'genres', 'get', 'anon',
+             '/api/v1/genres/?search={d.genre.name}', None, 200),
+    Scenario('genres-create', 'genres', 'post', 'admin',
+             '/api/v1/genres/',
+             lambda d: {'name': 'Жанр', 'slug': f'bench-{d.fresh()}'}, 201),
+    Scenario('categories-list', 'categories', 'get', 'anon',
+             '/api/v1/categories/', None, 200),
+    Scenario('categories-create', 'categories', 'post', 'admin',
+             '/api/v1/categories/',
+             lambda d: {'name': 'Кат', 'slug': f'bench-{d.fresh()}'}, 201),
+    Scenario('titles-list', 'titles', 'get', 'anon',
+             TITLES, None, 200),
+    Scenario('titles-list-limit-100', 'titles', 'get', 'anon',
+             TITLES + '?limit=100', None, 200),
+    Scenario('titles-deep-offset', 'titles', 'get', 'anon',
+             TITLES + '?offset=90&limit=10', None, 200),
+    Scenario('titles-cursor', 'titles', 'get', 'anon',
+             TITLES + '?cursor=', None, 200),
+    Scenario('titles-filtered', 'titles', 'get', 'anon',
+             TITLES + '?genre={d.genre.slug}&category={d.category.slug}',
+             None, 200),
+    Scenario('titles-search', 'titles', 'get', 'anon',
+             TITLES + '?search=тихий', None, 200),
+    Scenario('titles-detail', 'titles', 'get', 'anon',
+             TITLES + '{d.title.pk}/', None, 200),
+    Scenario('titles-create', 'titles', 'post', 'admin',
+             TITLES,
+             lambda d: {'name': 'Новинка', 'year': 2000,
+                        'genre': [d.genre.slug],
+                        'category': d.category.slug}, 201),
+    Scenario('titles-update', 'titles', 'patch', 'admin',
+             TITLES + '{d.title.pk}/',
+             lambda d: {'description': f'Описание {d.fresh()}'}, 200),
+    Scenario('reviews-list', 'reviews', 'get', 'anon',
+             REVIEWS, None, 200),
+    Scenario('reviews-cursor', 'reviews', 'get', 'anon',
+             REVIEWS + '?cursor=', None, 200),
+    Scenario('reviews-detail', 'reviews', 'get', 'anon',
+             REVIEWS + '{d.review.pk}/', None, 200),
+    Scenario('reviews-create', 'reviews', 'post', 'user',
+             lambda d: f'/api/v1/titles/{d.next_title_id()}/reviews/',
+             lambda d: {'text': 'Отзыв', 'score': 7}, 201),
+    Scenario('comments-list', 'comments', 'get', 'anon',
+             COMMENTS, None, 200),
+    Scenario('comments-detail', 'comments', 'get', 'anon',
+             COMMENTS + '{d.comment.pk}/', None, 200),
+    Scenario('comments-create', 'comments', 'post', 'user',
+             COMMENTS, lambda d: {'text': 'Комментарий'}, 201),
+    Scenario('auth-signup', 'auth', 'post', 'anon',
+             '/api/v1/auth/signup/', new_user, 200),
+    Scenario('auth-token', 'auth', 'post', 'anon',
+             '/api/v1/auth/token/',
+             lambda d: {'username': d.user.username,
+                        'confirmation_code': d.confirmation_code()}, 200),
+)
+
+
+def check_coverage(scenarios):
+    covered = {scenario.basename for scenario in scenarios}
+    missing = [
+        basename for _, _, basename in router_v1.registry
+        if basename not in covered
+    ]
+    if missing:
+        raise CommandError(
+            f'Нет сценариев для эндпоинтов: {", ".join(missing)}.')
+
+
+def percentile(values, share):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(share * len(ordered)))]
+
+
+def clients(data):
+    anon = APIClient()
+    result = {'anon': anon}
+    for name, user in (('admin', data.admin), ('user', data.user)):
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+        result[name] = client
+    return result
+
+
+def run_scenario(scenario, client, data, repeat, warmup):
+    timings = []
+    queries = 0
+    for iteration in range(warmup + repeat):
+        path = (
+            scenario.path(data) if callable(scenario.path)
+            else scenario.path.format(d=data))
+        payload = scenario.data(data) if scenario.data else None
+        request = getattr(client, scenario.method)
+        with CaptureQueriesContext(connection) as context:
+            started = time.perf_counter()
+            response = request(path, payload, format='json')
+            elapsed = time.perf_counter() - started
+        if response.status_code != scenario.status:
+            raise CommandError(
+                f'{scenario.name}: {scenario.method.upper()} {path} вернул '
+                f'{response.status_code} вместо {scenario.status}.')
+        if iteration >= warmup:
+            timings.append(elapsed * 1000)
+            queries = max(queries, len(context.captured_queries))
+    return {
+        'p50_ms': round(percentile(timings, 0.5), 3),
+        'p95_ms': round(percentile(timings, 0.95), 3),
+        'p99_ms': round(percentile(timings, 0.99), 3),
+        'queries': queries,
+    }
+
+
+def seed(size, seed_value=0):
+    """Заполнить пустую базу данными масштаба `size` произведений."""
+    call_command('flush', interactive=False, verbosity=0)
+    generate_data(
+        users=size, categories=max(1, size // 100),
+        genres=max(3, size // 50), titles=size, reviews=size * 10,
+        comments=size * 10, seed=seed_value, report=lambda message: None)
+
+
+# Сценарии повторяют запросы к auth чаще, чем разрешают лимиты,
+# а кеш ответов скрыл бы работу самих эндпоинтов.
+@override_settings(
+    REST_FRAMEWORK={
+        **settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {}},
+    RESPONSE_CACHE_TIMEOUT=0,
+)
+def run_benchmark(sizes=SIZES, repeat=REPEAT, warmup=WARMUP,
+                  scenarios=SCENARIOS, report=print):
+    """Прогнать сценарии на каждом размере базы, вернуть результаты.
+
+    Перед каждым размером база очищается, поэтому функцию можно
+    вызывать только на тестовой базе.
+    """
+    results = {}
+    for size in sizes:
+        if size < repeat + warmup:
+            raise CommandError(
+                f'Размер {size} меньше числа повторов {repeat + warmup}.')
+        seed(size)
+        data = BenchmarkData()
+        by_client = clients(data)
+        results[str(size)] = {}
+        for scenario in scenarios:
+            stats = run_scenario(
+                scenario, by_client[scenario.client], data, repeat, warmup)
+            results[str(size)][scenario.name] = stats
+            report(
+                f'{size:>7} {scenario.name:<24} '
+                f'p50 {stats["p50_ms"]:8.2f} мс  '
+                f'p95 {stats["p95_ms"]:8.2f} мс  '
+                f'p99 {stats["p99_ms"]:8.2f} мс  '
+                f'запросов {stats["queries"]}'
+            )
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Вернуть описания регрессий относительно сохранённых результатов.
+
+    Регрессией считается рост медианы больше чем на `threshold`
+    или любое увеличение числа SQL-запросов.
+    """
+    regressions = []
+    for size, scenarios in results.items():
+        for name, stats in scenarios.items():
+            before = baseline.get(size, {}).get(name)
+            if before is None:
+                continue
+            if stats['p50_ms'] > before['p50_ms'] * (1 + threshold):
+                regressions.append(
+                    f'{size} {name}: p50 {before["p50_ms"]} → '
+                    f'{stats["p50_ms"]} мс')
+            if stats['queries'] > before['queries']:
+                regressions.append(
+                    f'{size} {name}: запросов {before["queries"]} → '
+                    f'{stats["queries"]}')
+    return regressions
+
+
+class Command(BaseCommand):
+    help = (
+        'Замерить задержку и число SQL-запросов эндпоинтов API на базах '
+        'разного размера и сравнить с сохранёнными результатами.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            default=SIZES,
+            type=lambda value: tuple(int(size) for size in value.split(',')),
+            help='Размеры базы (число произведений) через запятую.',
+        )
+        parser.add_argument(
+            '--repeat', default=REPEAT, type=int,
+            help='Число замеров на сценарий.')
+        parser.add_argument(
+            '--warmup', default=WARMUP, type=int,
+            help='Число прогревочных запросов на сценарий.')
+        parser.add_argument(
+            '--only', default=None,
+            help='Запустить сценарии, имя которых начинается с префикса.')
+        parser.add_argument(
+            '--baseline', type=Path,
+            help='JSON с результатами для сравнения.')
+        parser.add_argument(
+            '--threshold', default=THRESHOLD, type=float,
+            help='Допустимый рост медианы, доля (0.2 — 20%%).')
+        parser.add_argument(
+            '--save', type=Path,
+            help='Сохранить результаты в JSON.')
+
+    def handle(self, *args, **options):
+        scenarios = SCENARIOS
+        if options['only']:
+            scenarios = [
+                scenario for scenario in SCENARIOS
+                if scenario.name.startswith(options['only'])
+            ]
+        else:
+            check_coverage(scenarios)
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True)
+        try:
+            results = run_benchmark(
+                options['sizes'], options['repeat'], options['warmup'],
+                scenarios, self.stdout.write)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+        if options['save']:
+            options['save'].write_text(
+                json.dumps(results, indent=2, ensure_ascii=False),
+                encoding='utf-8')
+        if options['baseline']:
+            baseline = json.loads(
+                options['baseline'].read_text(encoding='utf-8'))
+            regressions = compare(results, baseline, options['threshold'])
+            if regressions:
+                raise CommandError(
+                    'Обнаружены регрессии:\n' + '\n'.join(regressions))
+            self.stdout.write('Регрессий не обнаружено.')
@@ -0,0 +1,101 @@
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+
+TOP = 10
+ORDERINGS = {
+    'total': lambda entry: entry['total_ms'],
+    'max': lambda entry: entry['max_ms'],
+    'count': lambda entry: entry['count'],
+}
+
+
+def log_files(path):
+    """Ротированные копии журнала и текущий файл, от старых к новым."""
+    candidates = [
+        path.with_name(f'{path.name}.{number}')
+        for number in range(settings.SLOW_QUERY_LOG_BACKUP_COUNT, 0, -1)
+    ]
+    return [
+        candidate for candidate in (*candidates, path) if candidate.exists()]
+
+
+def read_records(paths):
+    for path in paths:
+        with open(path, encoding='utf-8') as file:
+            for line in file:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+
+def aggregate(records):
+    """Сгруппировать записи журнала по отпечатку запроса."""
+    entries = {}
+    for record in records:
+        entry = entries.setdefault(record['fingerprint'], {
+            'fingerprint': record['fingerprint'],
+            'count': 0,
+            'total_ms': 0.0,
+            'max_ms': 0.0,
+            'views': set(),
+            'sql': record['sql'],
+            'params': record['params'],
+            'plan': None,
+        })
+        entry['count'] += 1
+        entry['total_ms'] += record['duration_ms']
+        if record['duration_ms'] >= entry['max_ms']:
+            entry['max_ms'] = record['duration_ms']
+            entry['sql'] = record['sql']
+            entry['params'] = record['params']
+        if record.get('view'):
+            entry['views'].add(f'{record["method"]} {record["view"]}')
+        if record.get('plan'):
+            entry['plan'] = record['plan']
+    return list(entries.values())
+
+
+def top_offenders(path=None, top=TOP, order_by='total'):
+    path = Path(path or settings.SLOW_QUERY_LOG_FILE)
+    entries = aggregate(read_records(log_files(path)))
+    entries.sort(key=ORDERINGS[order_by], reverse=True)
+    return entries[:top]
+
+
+class Command(BaseCommand):
+    help = 'Показать самые медленные SQL-запросы из журнала.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top', default=TOP, type=int,
+            help='Число запросов в отчёте.')
+        parser.add_argument(
+            '--order-by', default='total', choices=ORDERINGS,
+            help='Сортировка: суммарное время, максимум или число повторов.')
+        parser.add_argument(
+            '--file', type=Path,
+            help='Файл журнала (по умолчанию SLOW_QUERY_LOG_FILE).')
+
+    def handle(self, *args, **options):
+        entries = top_offenders(
+            options['file'], options['top'], options['order_by'])
+        if not entries:
+            raise CommandError('Журнал медленных запросов пуст.')
+        for number, entry in enumerate(entries, start=1):
+            self.stdout.write(
+                f'{number}. [{entry["fingerprint"]}] '
+                f'повторов {entry["count"]}, '
+                f'всего {entry["total_ms"]:.1f} мс, '
+                f'максимум {entry["max_ms"]:.1f} мс'
+            )
+            if entry['views']:
+                self.stdout.write(
+                    '   Источники: ' + ', '.join(sorted(entry['views'])))
+            self.stdout.write(f'   SQL: {entry["sql"]}')
+            self.stdout.write(f'   Параметры: {entry["params"]}')
+            for line in entry['plan'] or ('план не сохранён',):
+                self.stdout.write(f'   План: {line}')
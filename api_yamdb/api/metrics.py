@@ -0,0 +1,174 @@
+"""Метрики запросов к API в текстовом формате Prometheus.
+
+Метрики хранятся в памяти процесса: для каждой пары «имя маршрута —
+HTTP-метод» фиксированный набор счётчиков, а число таких пар
+ограничено, поэтому объём памяти не растёт со временем работы.
+"""
+import threading
+import time
+from bisect import bisect_left
+
+from django.db import connection
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100)
+METHODS = frozenset(
+    ('GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'))
+MAX_SERIES = 500
+UNRESOLVED = 'unresolved'
+OTHER = 'other'
+
+
+class Series:
+    """Накопленные значения одной пары «маршрут — метод»."""
+
+    __slots__ = (
+        'count', 'latency_buckets', 'latency_sum', 'query_buckets',
+        'queries', 'sql_seconds')
+
+    def __init__(self):
+        self.count = 0
+        self.latency_buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.latency_sum = 0.0
+        self.query_buckets = [0] * (len(QUERY_BUCKETS) + 1)
+        self.queries = 0
+        self.sql_seconds = 0.0
+
+
+class MetricsRegistry:
+    """Потокобезопасное хранилище метрик одного процесса."""
+
+    def __init__(self, max_series=MAX_SERIES):
+        self.max_series = max_series
+        self.lock = threading.Lock()
+        self.series = {}
+        self.gauges = {}
+
+    def add_gauge(self, name, help_text, collect):
+        """Зарегистрировать показатель, вычисляемый при каждом опросе."""
+        self.gauges[name] = (help_text, collect)
+
+    def observe(self, route, method, seconds, queries, sql_seconds):
+        if method not in METHODS:
+            method = OTHER
+        key = (route, method)
+        with self.lock:
+            series = self.series.get(key)
+            if series is None:
+                if len(self.series) >= self.max_series:
+                    key = (OTHER, method)
+                series = self.series.setdefault(key, Series())
+            series.count += 1
+            series.latency_buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            series.latency_sum += seconds
+            series.query_buckets[bisect_left(QUERY_BUCKETS, queries)] += 1
+            series.queries += queries
+            series.sql_seconds += sql_seconds
+
+    def clear(self):
+        with self.lock:
+            self.series.clear()
+
+    def render(self):
+        """Вернуть метрики в текстовом формате Prometheus 0.0.4."""
+        with self.lock:
+            snapshot = sorted(
+                (key, series.count, list(series.latency_buckets),
+                 series.latency_sum, list(series.query_buckets),
+                 series.queries, series.sql_seconds)
+                for key, series in self.series.items()
+            )
+        lines = [
+            '# HELP yamdb_request_duration_seconds '
+            'Время обработки запроса.',
+            '# TYPE yamdb_request_duration_seconds histogram',
+        ]
+        for (route, method), count, buckets, total, *_ in snapshot:
+            lines.extend(histogram(
+                'yamdb_request_duration_seconds', route, method,
+                LATENCY_BUCKETS, buckets, total, count))
+        lines += [
+            '# HELP yamdb_request_queries Число SQL-запросов на запрос.',
+            '# TYPE yamdb_request_queries histogram',
+        ]
+        for (route, method), count, _, _, buckets, queries, _ in snapshot:
+            lines.extend(histogram(
+                'yamdb_request_queries', route, method,
+                QUERY_BUCKETS, buckets, queries, count))
+        lines += [
+            '# HELP yamdb_request_sql_seconds_total '
+            'Суммарное время выполнения SQL-запросов.',
+            '# TYPE yamdb_request_sql_seconds_total counter',
+        ]
+        for (route, method), *_, sql_seconds in snapshot:
+            lines.append(
+                f'yamdb_request_sql_seconds_total'
+                f'{{{labels(route, method)}}} {sql_seconds}')
+        for name, (help_text, collect) in sorted(self.gauges.items()):
+            lines += [
+                f'# HELP {name} {help_text}',
+                f'# TYPE {name} gauge',
+                f'{name} {collect()}',
+            ]
+        return '\n'.join(lines) + '\n'
+
+
+def labels(route, method):
+    route = route.replace('\\', '\\\\').replace('"', '\\"')
+    return f'route="{route}",method="{method}"'
+
+
+def histogram(name, route, method, bounds, buckets, total, count):
+    cumulative = 0
+    for bound, value in zip(bounds, buckets):
+        cumulative += value
+        yield (f'{name}_bucket{{{labels(route, method)},le="{bound}"}} '
+               f'{cumulative}')
+    yield f'{name}_bucket{{{labels(route, method)},le="+Inf"}} {count}'
+    yield f'{name}_sum{{{labels(route, method)}}} {total}'
+    yield f'{name}_count{{{labels(route, method)}}} {count}'
+
+
+registry = MetricsRegistry()
+
+
+class QueryTimer:
+    """Обёртка execute_wrapper: считает запросы и время в базе."""
+
+    __slots__ = ('queries', 'seconds')
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.queries += 1
+
+
+class MetricsMiddleware:
+    """Записывает время ответа и работу с базой для каждого запроса.
+
+    Маршрут определяется по имени URL, поэтому запросы
+    к `/titles/1/` и `/titles/2/` попадают в один ряд `titles-detail`.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timer = QueryTimer()
+        started = time.perf_counter()
+        with connection.execute_wrapper(timer):
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+        match = getattr(request, 'resolver_match', None)
+        registry.observe(
+            match.view_name if match else UNRESOLVED, request.method,
+            elapsed, timer.queries, timer.seconds)
+        return response
@@ -1,4 +1,5 @@
 from rest_framework import mixins, viewsets
+from rest_framework.exceptions import ValidationError
 
 
 class CreateListDestroyViewSet(mixins.CreateModelMixin,
@@ -6,3 +7,81 @@ class CreateListDestroyViewSet(mixins.CreateModelMixin,
                                mixins.DestroyModelMixin,
                                viewsets.GenericViewSet):
     pass
+
+
+class SparseFieldsMixin:
+    """Выбор полей ответа параметрами `?fields=` и `?omit=`.
+
+    `sparse_fields` сопоставляет полю сериализатора пути полей модели,
+    которые нужны для его вывода. Для list и retrieve запрос загружает
+    только их (`.only()`), а связи, которые не попали в ответ, не
+    присоединяются и не подгружаются. Сериализатор должен наследовать
+    serializers.SparseFieldsSerializerMixin.
+    """
+    fields_param = 'fields'
+    omit_param = 'omit'
+    sparse_fields = {}
+    sparse_actions = ('list', 'retrieve')
+
+    def get_sparse_fields(self):
+        """Множество выбранных полей или None, если выбор не задан."""
+        if self.action not in self.sparse_actions:
+            return None
+        params = self.request.query_params
+        if self.fields_param not in params and self.omit_param not in params:
+            return None
+        selected = set(self.sparse_fields)
+        if self.fields_param in params:
+            selected = self.parse_fields(self.fields_param)
+        return selected - self.parse_fields(self.omit_param)
+
+    def parse_fields(self, param):
+        names = {
+            name.strip()
+            for value in self.request.query_params.getlist(param)
+            for name in value.split(',') if name.strip()
+        }
+        unknown = names - set(self.sparse_fields)
+        if unknown:
+            raise ValidationError({param: (
+                f'Неизвестные поля: {", ".join(sorted(unknown))}. '
+                f'Доступны: {", ".join(self.sparse_fields)}.'
+            )})
+        return names
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['fields'] = self.get_sparse_fields()
+        return context
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        fields = self.get_sparse_fields()
+        if fields is None:
+            return queryset
+        return self.restrict_queryset(queryset, fields)
+
+    def restrict_queryset(self, queryset, fields):
+        opts = queryset.model._meta
+        only, select, prefetch = {opts.pk.name}, set(), set()
+        # Курсорная пагинация читает поля порядка у последнего объекта,
+        # условный GET — поле версии у объектов курсорной страницы.
+        only.update(
+            name.lstrip('-') for name in getattr(self, 'cursor_ordering', ()))
+        if getattr(self, 'version_field', None):
+            only.add(self.version_field)
+        for name in fields:
+            for path in self.sparse_fields[name]:
+                field_name, _, related_path = path.partition('__')
+                if opts.get_field(field_name).many_to_many:
+                    prefetch.add(field_name)
+                    continue
+                only.add(path)
+                if related_path:
+                    only.add(field_name)
+                    select.add(field_name)
+        # select_related() без аргументов присоединил бы все связи.
+        queryset = queryset.select_related(None).prefetch_related(None)
+        if select:
+            queryset = queryset.select_related(*select)
+        return queryset.prefetch_related(*prefetch).only(*only)
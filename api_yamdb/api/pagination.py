@@ -0,0 +1,56 @@
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination
+
+
+class KeysetPagination(CursorPagination):
+    """Курсорная пагинация без подсчёта общего числа объектов.
+
+    Порядок всегда берётся из атрибута `cursor_ordering` вьюсета:
+    параметр `?ordering=` курсор не меняет, иначе ключом стали бы
+    поля со значениями NULL и без добавочной сортировки по id.
+    """
+    ordering = ('id',)
+    page_size_query_param = 'limit'
+
+    def get_ordering(self, request, queryset, view):
+        return tuple(getattr(view, 'cursor_ordering', self.ordering))
+
+
+class LimitOffsetOrCursorPagination(LimitOffsetPagination):
+    """limit/offset по умолчанию, курсор — при наличии параметра `cursor`.
+
+    Если вьюсет уже посчитал объекты (атрибут `collection_count`),
+    отдельный запрос COUNT не выполняется.
+    """
+    cursor_query_param = 'cursor'
+    cursor_pagination_class = KeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_paginator = None
+        self.known_count = getattr(view, 'collection_count', None)
+        if self.cursor_query_param not in request.query_params:
+            return super().paginate_queryset(queryset, request, view)
+        self.cursor_paginator = self.cursor_pagination_class()
+        return self.cursor_paginator.paginate_queryset(
+            queryset, request, view)
+
+    def get_count(self, queryset):
+        if self.known_count is not None:
+            return self.known_count
+        return super().get_count(queryset)
+
+    def get_next_link(self):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_next_link()
+        return super().get_next_link()
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_schema_operation_parameters(self, view):
+        return (
+            super().get_schema_operation_parameters(view)
+            + self.cursor_pagination_class().get_schema_operation_parameters(
+                view)[:1]
+        )
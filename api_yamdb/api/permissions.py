@@ -28,4 +28,4 @@ class IsAuthorActionOrAdminOrModeratorOrReadOnly(permissions.BasePermission):
             return True
         return (request.method in permissions.SAFE_METHODS
                 or request.user.is_moderator_role or request.user.is_admin_role
-                or obj.author == request.user)
+                or obj.author_id == request.user.id)
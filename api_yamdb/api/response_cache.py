@@ -0,0 +1,121 @@
+"""Кеш готовых ответов API для анонимных запросов на чтение.
+
+Каждый ответ помечен тегами (например, `titles`), а в ключ кеша входят
+текущие поколения этих тегов. Сброс тега — увеличение его поколения:
+старые ключи больше не запрашиваются и истекают сами, поэтому сброс
+стоит одну операцию с кешем. Чтобы сброс был виден всем процессам,
+кеш RESPONSE_CACHE_ALIAS должен быть общим (файловый или в базе).
+"""
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+
+CACHED_HEADERS = ('Content-Type', 'Allow', 'Vary', 'ETag', 'Last-Modified')
+# Теги всех кешируемых ответов: их сбрасывают массовые загрузки,
+# которые обходят сигналы моделей.
+CATALOG_TAGS = ('categories', 'genres', 'titles')
+
+
+def response_cache():
+    return caches[settings.RESPONSE_CACHE_ALIAS]
+
+
+def generation_key(tag):
+    return f'response-generation:{tag}'
+
+
+def invalidate_cached_responses(*tags):
+    """Сбросить закешированные ответы с любым из тегов."""
+    cache = response_cache()
+    for tag in tags:
+        try:
+            cache.incr(generation_key(tag))
+        except ValueError:
+            cache.set(generation_key(tag), time.time_ns(), timeout=None)
+
+
+def generations(tags):
+    """Текущие поколения тегов.
+
+    Пропавшее из кеша поколение начинается с текущего времени, а не
+    с нуля, чтобы не совпасть с ключами, записанными до вытеснения.
+    """
+    cache = response_cache()
+    keys = [generation_key(tag) for tag in tags]
+    values = cache.get_many(keys)
+    for key in keys:
+        if key not in values:
+            cache.add(key, time.time_ns(), timeout=None)
+            values[key] = cache.get(key)
+    return [values[key] for key in keys]
+
+
+def cache_key(request, tags):
+    query = urlencode(sorted(
+        (name, value)
+        for name, values in request.GET.lists() for value in values
+    ))
+    source = '\n'.join((
+        request.path,
+        query,
+        request.META.get('HTTP_ACCEPT', ''),
+        *(f'{tag}={generation}'
+          for tag, generation in zip(tags, generations(tags))),
+    ))
+    return 'response:' + hashlib.blake2b(
+        source.encode(), digest_size=16).hexdigest()
+
+
+def is_cacheable(request):
+    return (
+        settings.RESPONSE_CACHE_TIMEOUT != 0
+        and request.method == 'GET'
+        and 'HTTP_AUTHORIZATION' not in request.META
+    )
+
+
+class AnonymousResponseCacheMixin:
+    """Отдаёт анонимным GET-запросам сохранённые байты ответа.
+
+    Вьюсет задаёт `response_cache_tags`; сигналы моделей сбрасывают
+    эти теги при изменении данных (см. api.signals). Сохранённые
+    ETag и Last-Modified позволяют ответить 304 прямо из кеша.
+    """
+    response_cache_tags = ()
+
+    def dispatch(self, request, *args, **kwargs):
+        if not self.response_cache_tags or not is_cacheable(request):
+            return super().dispatch(request, *args, **kwargs)
+        key = cache_key(request, self.response_cache_tags)
+        cached = response_cache().get(key)
+        if cached is not None:
+            content, headers = cached
+            response = get_conditional_response(
+                request, etag=headers.get('ETag'),
+                last_modified=parse_http_date_safe(
+                    headers.get('Last-Modified', '')))
+            if response is None:
+                response = HttpResponse(content)
+            for name, value in headers.items():
+                response[name] = value
+            return response
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code == 200:
+            response.add_post_render_callback(
+                lambda rendered: store_response(key, rendered))
+        return response
+
+
+def store_response(key, response):
+    headers = {
+        name: response[name] for name in CACHED_HEADERS
+        if response.has_header(name)
+    }
+    response_cache().set(
+        key, (response.content, headers), settings.RESPONSE_CACHE_TIMEOUT)
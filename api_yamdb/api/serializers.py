@@ -1,13 +1,32 @@
 from django.contrib.auth.validators import UnicodeUsernameValidator
-from django.shortcuts import get_object_or_404
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 from rest_framework.relations import SlugRelatedField
+from rest_framework.settings import api_settings
 
 from reviews.models import Category, Comment, Genre, Review, Title
 from users.models import User
 
 
+class SparseFieldsSerializerMixin:
+    """Оставляет в ответе поля из контекста `fields` (см. SparseFieldsMixin).
+
+    Поля отбрасываются до сериализации, поэтому не выбранные связи
+    и отложенные столбцы не читаются.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        selected = self.context.get('fields')
+        if selected is None:
+            return fields
+        return {
+            name: field for name, field in fields.items()
+            if name in selected
+        }
+
+
 class UserSerializer(serializers.ModelSerializer):
 
     class Meta:
@@ -54,14 +73,14 @@ class TokenSerializer(serializers.Serializer):
 class GenreSerializer(serializers.ModelSerializer):
     class Meta:
         model = Genre
-        exclude = ['id']
+        fields = ('name', 'slug')
         lookup_field = 'slug'
 
 
 class CategorySerializer(serializers.ModelSerializer):
     class Meta:
         model = Category
-        exclude = ['id']
+        fields = ('name', 'slug')
         lookup_field = 'slug'
 
 
@@ -82,40 +101,56 @@ class TitleSerializer(serializers.ModelSerializer):
         return TitleReadSerializer(instance).data
 
 
-class TitleReadSerializer(serializers.ModelSerializer):
+class TitleReadSerializer(SparseFieldsSerializerMixin,
+                          serializers.ModelSerializer):
     genre = GenreSerializer(read_only=True, many=True)
     category = CategorySerializer(read_only=True)
     rating = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Title
-        fields = ('id', 'name', 'year', 'rating',
+        fields = ('id', 'name', 'year', 'rating', 'reviews_count',
                   'description', 'genre', 'category')
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(SparseFieldsSerializerMixin,
+                       serializers.ModelSerializer):
     author = SlugRelatedField(slug_field='username', read_only=True)
 
     class Meta:
-        fields = ('id', 'text', 'author', 'score', 'pub_date',)
+        fields = ('id', 'text', 'author', 'score', 'pub_date',
+                  'comments_count',)
         model = Review
 
-    def validate(self, data):
-        """Проверка на оставление одного отзыва."""
-        request = self.context['request']
-        if request.method != 'POST':
-            return data
-        author = request.user
-        title_id = self.context.get('view').kwargs.get('title_id')
-        title = get_object_or_404(Title, pk=title_id)
-        if Review.objects.filter(title=title, author=author).exists():
-            raise ValidationError('Можно оставить только один отзыв.')
-        return data
+    def create(self, validated_data):
+        """Создать отзыв; второй отзыв автора отсекает unique_title_author.
 
-
-class CommentSerializer(serializers.ModelSerializer):
+        Ограничение проверяет база при вставке, поэтому отдельный запрос
+        на существование отзыва не нужен и гонка двух запросов исключена.
+        """
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError:
+            if not Review.objects.filter(
+                    title=validated_data['title'],
+                    author=validated_data['author']).exists():
+                raise
+        raise ValidationError({
+            api_settings.NON_FIELD_ERRORS_KEY: [
+                'Можно оставить только один отзыв.'],
+        })
+
+
+class CommentSerializer(SparseFieldsSerializerMixin,
+                        serializers.ModelSerializer):
     author = SlugRelatedField(read_only=True, slug_field='username')
 
     class Meta:
         fields = ('id', 'text', 'author', 'pub_date',)
         model = Comment
+
+    def create(self, validated_data):
+        """Комментарий и счётчик отзыва сохраняются в одной транзакции."""
+        with transaction.atomic():
+            return super().create(validated_data)
@@ -0,0 +1,43 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from api.response_cache import invalidate_cached_responses
+from reviews.models import Category, Genre, Review, Title
+
+
+def invalidate_after_commit(*tags):
+    # До фиксации транзакции параллельный запрос закешировал бы
+    # старые данные под новым поколением.
+    transaction.on_commit(lambda: invalidate_cached_responses(*tags))
+
+
+# Какие закешированные ответы устаревают при изменении модели:
+# произведения включают жанры, категорию и рейтинг из отзывов.
+INVALIDATED_TAGS = {
+    Title: ('titles',),
+    Genre: ('genres', 'titles'),
+    Category: ('categories', 'titles'),
+    Review: ('titles',),
+}
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_save, sender=Genre)
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Title)
+@receiver(post_delete, sender=Genre)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Review)
+def invalidate_on_change(sender, raw=False, **kwargs):
+    """Сбросить кеш ответов, в которых есть изменённый объект."""
+    if not raw:
+        invalidate_after_commit(*INVALIDATED_TAGS[sender])
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def invalidate_on_genres_change(sender, action, **kwargs):
+    """Сбросить кеш произведений при смене их жанров."""
+    if action.startswith('post_'):
+        invalidate_after_commit('titles')
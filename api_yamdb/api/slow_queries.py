@@ -0,0 +1,159 @@
+"""Журнал медленных SQL-запросов с планами выполнения.
+
+Включается настройкой SLOW_QUERY_THRESHOLD_MS. Каждый запрос дольше
+порога записывается строкой JSON в ротируемый файл; план
+(`EXPLAIN QUERY PLAN` в SQLite) снимается только для первого появления
+запроса с данным отпечатком, повторы пишутся без него. План снимается
+только для SELECT: изменяющие запросы и DDL записываются без плана.
+"""
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from logging.handlers import RotatingFileHandler
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DatabaseError, connection, transaction
+from django.utils import timezone
+
+MAX_PARAMS_LENGTH = 500
+MAX_FINGERPRINTS = 1000
+
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+PLACEHOLDER_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+WHITESPACE = re.compile(r'\s+')
+
+logger = logging.getLogger('api.slow_queries')
+
+
+def normalize_sql(sql):
+    """Привести запрос к виду, не зависящему от значений параметров."""
+    sql = STRING_LITERAL.sub('?', sql)
+    sql = NUMBER_LITERAL.sub('?', sql)
+    sql = sql.replace('%s', '?')
+    sql = PLACEHOLDER_LIST.sub('(...)', sql)
+    return WHITESPACE.sub(' ', sql).strip()
+
+
+def fingerprint(sql):
+    return hashlib.blake2b(
+        normalize_sql(sql).encode(), digest_size=8).hexdigest()
+
+
+def is_select(sql):
+    return sql.lstrip().upper().startswith('SELECT')
+
+
+def explain(sql, params):
+    """Снять план запроса в точке сохранения.
+
+    Ошибка EXPLAIN откатывает только точку сохранения и не ломает
+    транзакцию, в которой выполняется запрос приложения.
+    """
+    prefix = (
+        'EXPLAIN QUERY PLAN ' if connection.vendor == 'sqlite' else 'EXPLAIN ')
+    with transaction.atomic(savepoint=True), connection.cursor() as cursor:
+        cursor.execute(prefix + sql, params)
+        return [' '.join(map(str, row)) for row in cursor.fetchall()]
+
+
+class SeenFingerprints:
+    """Ограниченный по размеру набор отпечатков, для которых снят план."""
+
+    def __init__(self, size=MAX_FINGERPRINTS):
+        self.size = size
+        self.lock = threading.Lock()
+        self.items = OrderedDict()
+
+    def add(self, key):
+        """Добавить отпечаток; вернуть True, если его ещё не было."""
+        with self.lock:
+            if key in self.items:
+                self.items.move_to_end(key)
+                return False
+            self.items[key] = None
+            if len(self.items) > self.size:
+                self.items.popitem(last=False)
+            return True
+
+
+seen = SeenFingerprints()
+
+
+class SlowQueryRecorder:
+    """Обёртка execute_wrapper, записывающая медленные запросы запроса."""
+
+    def __init__(self, request, threshold_ms):
+        self.request = request
+        self.threshold_ms = threshold_ms
+        self.explaining = False
+
+    def __call__(self, execute, sql, params, many, context):
+        if self.explaining:
+            return execute(sql, params, many, context)
+        started = time.perf_counter()
+        result = execute(sql, params, many, context)
+        duration_ms = (time.perf_counter() - started) * 1000
+        if duration_ms >= self.threshold_ms:
+            self.record(sql, params, many, duration_ms)
+        return result
+
+    def record(self, sql, params, many, duration_ms):
+        key = fingerprint(sql)
+        plan = None
+        if not many and is_select(sql) and seen.add(key):
+            self.explaining = True
+            try:
+                plan = explain(sql, params)
+            except DatabaseError as error:
+                plan = [f'EXPLAIN не выполнен: {error}']
+            finally:
+                self.explaining = False
+        match = getattr(self.request, 'resolver_match', None)
+        logger.warning(json.dumps({
+            'time': timezone.now().isoformat(),
+            'fingerprint': key,
+            'duration_ms': round(duration_ms, 3),
+            'view': match.view_name if match else None,
+            'method': self.request.method,
+            'path': self.request.path,
+            'sql': sql,
+            'params': repr(params)[:MAX_PARAMS_LENGTH],
+            'plan': plan,
+        }, ensure_ascii=False))
+
+
+def configure_logger():
+    path = settings.SLOW_QUERY_LOG_FILE
+    if any(getattr(handler, 'baseFilename', None) == str(path)
+           for handler in logger.handlers):
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    handler = RotatingFileHandler(
+        path, maxBytes=settings.SLOW_QUERY_LOG_MAX_BYTES,
+        backupCount=settings.SLOW_QUERY_LOG_BACKUP_COUNT, encoding='utf-8')
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    logger.addHandler(handler)
+    logger.setLevel(logging.WARNING)
+    logger.propagate = False
+
+
+class SlowQueryMiddleware:
+    """Подключает SlowQueryRecorder к каждому запросу, если журнал включён."""
+
+    def __init__(self, get_response):
+        if settings.SLOW_QUERY_THRESHOLD_MS is None:
+            raise MiddlewareNotUsed
+        configure_logger()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = SlowQueryRecorder(
+            request, settings.SLOW_QUERY_THRESHOLD_MS)
+        with connection.execute_wrapper(recorder):
+            return self.get_response(request)
@@ -0,0 +1,131 @@
+"""Ограничение частоты запросов алгоритмом «корзина токенов».
+
+Корзины лежат в таблице ThrottleBucket, поэтому лимит общий для всех
+процессов, работающих с одной базой. Проверка — один запрос
+INSERT ... ON CONFLICT DO UPDATE ... RETURNING по уникальному ключу.
+"""
+import random
+import time
+
+from django.db import connection
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+from users.models import ThrottleBucket
+
+# Доля запросов, после которых удаляются давно не использованные корзины.
+PRUNE_PROBABILITY = 0.001
+MAX_USERNAME_LENGTH = 150
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+# excluded — строка, которую пытались вставить: в ней текущие время,
+# ёмкость и скорость наполнения.
+TAKE_TOKEN_SQL = '''
+INSERT INTO {table} ("key", capacity, rate, tokens, updated_at, allowed)
+VALUES (%s, %s, %s, %s, %s, %s)
+ON CONFLICT ("key") DO UPDATE SET
+    tokens = {refill} - CASE WHEN {refill} >= 1 THEN 1 ELSE 0 END,
+    allowed = {refill} >= 1,
+    capacity = excluded.capacity,
+    rate = excluded.rate,
+    updated_at = excluded.updated_at
+RETURNING tokens, allowed
+'''
+REFILL_SQL = (
+    '{least}(excluded.capacity, {table}.tokens + {greatest}('
+    '0, excluded.updated_at - {table}.updated_at) * excluded.rate)'
+)
+
+
+def parse_rate(rate):
+    """'5/min' → (5, 60): ёмкость корзины и период её наполнения."""
+    count, period = rate.split('/')
+    return int(count), PERIODS[period[0]]
+
+
+def take_token_sql():
+    table = connection.ops.quote_name(ThrottleBucket._meta.db_table)
+    if connection.vendor == 'sqlite':
+        least, greatest = 'min', 'max'
+    else:
+        least, greatest = 'LEAST', 'GREATEST'
+    refill = REFILL_SQL.format(least=least, greatest=greatest, table=table)
+    return TAKE_TOKEN_SQL.format(table=table, refill=refill)
+
+
+def take_token(key, capacity, period, now=None):
+    """Взять токен из корзины; вернуть (пропущен ли запрос, токенов)."""
+    now = time.time() if now is None else now
+    with connection.cursor() as cursor:
+        cursor.execute(take_token_sql(), (
+            key, capacity, capacity / period, capacity - 1, now, True))
+        tokens, allowed = cursor.fetchone()
+    if random.random() < PRUNE_PROBABILITY:
+        prune_buckets(now)
+    return bool(allowed), tokens
+
+
+def prune_buckets(now, max_period=max(PERIODS.values())):
+    """Удалить корзины, которые успели бы наполниться до краёв."""
+    ThrottleBucket.objects.filter(updated_at__lt=now - max_period).delete()
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """Базовый ограничитель; частота берётся из DEFAULT_THROTTLE_RATES.
+
+    Подклассы задают `scope` и `get_ident_key`. Если для `scope`
+    частота не задана (None), запросы не ограничиваются.
+    """
+    scope = None
+
+    def get_ident_key(self, request):
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        self.retry_after = None
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+        ident = self.get_ident_key(request)
+        if rate is None or ident is None:
+            return True
+        capacity, period = parse_rate(rate)
+        allowed, tokens = take_token(
+            f'{self.scope}:{ident}', capacity, period)
+        if not allowed:
+            self.retry_after = (1 - tokens) * period / capacity
+        return allowed
+
+    def wait(self):
+        return self.retry_after
+
+
+class IPThrottle(TokenBucketThrottle):
+    """Корзина на IP-адрес клиента."""
+
+    def get_ident_key(self, request):
+        return f'ip:{self.get_ident(request)}'
+
+
+class UsernameThrottle(TokenBucketThrottle):
+    """Корзина на имя пользователя из тела запроса."""
+
+    def get_ident_key(self, request):
+        username = getattr(request.data, 'get', dict().get)('username')
+        if not isinstance(username, str) or not username:
+            return None
+        return f'username:{username[:MAX_USERNAME_LENGTH].casefold()}'
+
+
+class SignupIPThrottle(IPThrottle):
+    scope = 'signup_ip'
+
+
+class SignupUsernameThrottle(UsernameThrottle):
+    scope = 'signup_username'
+
+
+class TokenIPThrottle(IPThrottle):
+    scope = 'token_ip'
+
+
+class TokenUsernameThrottle(UsernameThrottle):
+    scope = 'token_username'
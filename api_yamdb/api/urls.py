@@ -3,7 +3,8 @@ from rest_framework import routers
 
 from .views import CommentViewSet, ReviewViewSet
 from api.views import (CategoryViewSet, GenreViewSet, TitleViewSet,
-                       UserViewSet, get_token, user_registry_signup)
+                       UserViewSet, get_token, metrics,
+                       user_registry_signup)
 
 router_v1 = routers.DefaultRouter()
 
@@ -31,5 +32,6 @@ auth_urls = [
 
 urlpatterns = [
     path('v1/', include(router_v1.urls)),
-    path('v1/auth/', include(auth_urls))
+    path('v1/auth/', include(auth_urls)),
+    path('v1/metrics/', metrics, name='metrics'),
 ]
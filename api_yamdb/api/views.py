@@ -1,12 +1,13 @@
-from django.core.mail import send_mail
-from django.db.models import Avg
+from django.http import HttpResponse
+from django.db import IntegrityError, transaction
+from django.db.models import Q
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from django.contrib.auth.tokens import default_token_generator
 from rest_framework import viewsets
-from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.decorators import (action, api_view, permission_classes,
+                                       throttle_classes)
 from rest_framework.exceptions import ValidationError
-from rest_framework.filters import SearchFilter
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.status import HTTP_200_OK
@@ -21,11 +22,20 @@ from .serializers import (CategorySerializer, CommentSerializer,
                           TokenSerializer, SignUpSerializer,
                           UserSerializer, UserNotAdminSerializer)
 
-from api.filters import TitlesFilter
+from api.conditional import ConditionalGetMixin
+from api.filters import (SearchKeyFilter, StableOrderingFilter,
+                         TitlesFilter)
+from api.metrics import registry
+from api.mixins import SparseFieldsMixin
+from api.pagination import LimitOffsetOrCursorPagination
+from api.response_cache import AnonymousResponseCacheMixin
+from api.throttling import (SignupIPThrottle, SignupUsernameThrottle,
+                            TokenIPThrottle, TokenUsernameThrottle)
 from api.viewsets import AdminOrReadyViewSet
 from api_yamdb.settings import HOST_EMAIL
-from reviews.models import Category, Genre, Review, Title
+from reviews.models import Category, Comment, Genre, Review, Title
 from users.models import User
+from users.outbox import enqueue_email
 
 
 class UserViewSet(ModelViewSet):
@@ -33,8 +43,8 @@ class UserViewSet(ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = (IsAdminRole,)
-    filter_backends = (SearchFilter,)
-    search_fields = ('username', )
+    filter_backends = (SearchKeyFilter,)
+    search_key_field = 'username_search'
     lookup_field = 'username'
     http_method_names = ('get', 'post', 'patch', 'delete')
 
@@ -60,33 +70,66 @@ class UserViewSet(ModelViewSet):
         return Response(serializer.data, status=HTTP_200_OK)
 
 
+def find_signup_user(username, email):
+    """Вернуть пользователя с этими username и email или None.
+
+    Оба поля уникальны, поэтому хватает одного запроса по индексам;
+    если они принадлежат разным пользователям, это ошибка валидации.
+    Поиск выполняется вне транзакции записи: в SQLite транзакция,
+    начатая чтением, не может дождаться блокировки на запись.
+    """
+    users = list(User.objects.filter(Q(username=username) | Q(email=email)))
+    if not users:
+        return None
+    if len(users) == 1 and (users[0].username, users[0].email) == (
+            username, email):
+        return users[0]
+    field_name = (
+        'email' if any(user.email == email for user in users)
+        else 'username')
+    raise ValidationError({field_name: 'Поле должно быть уникальным.'})
+
+
+def create_signup_user(username, email):
+    """Создать пользователя для регистрации.
+
+    Гонку параллельных регистраций разрешают ограничения уникальности:
+    проигравший запрос получает IntegrityError и перечитывает победителя.
+    """
+    try:
+        with transaction.atomic():
+            return User.objects.create(username=username, email=email)
+    except IntegrityError:
+        user = find_signup_user(username, email)
+        if user is None:
+            raise
+        return user
+
+
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([SignupIPThrottle, SignupUsernameThrottle])
 def user_registry_signup(request):
     """Регистрация пользователя."""
     serializer = SignUpSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
-    user_by_username = User.objects.filter(
-        username=serializer.data['username']).first()
-    user_by_email = User.objects.filter(email=serializer.data['email']).first()
-
-    if not user_by_username == user_by_email:
-        field_name = 'email' if user_by_email else 'username'
-        message = {f'{field_name}': 'Поле должно быть уникальным.'}
-        raise ValidationError(message)
-
-    user, _ = User.objects.update_or_create(
-        username=serializer.data['username'], defaults=serializer.data)
-    confirmation_code = default_token_generator.make_token(user)
-    send_mail(subject='Код доступа',
-              message=f'Your confirmation code {confirmation_code}',
-              from_email=HOST_EMAIL,
-              recipient_list=[serializer.data.get('email')])
+    username = serializer.data['username']
+    email = serializer.data['email']
+    user = find_signup_user(username, email)
+    with transaction.atomic():
+        if user is None:
+            user = create_signup_user(username, email)
+        confirmation_code = default_token_generator.make_token(user)
+        enqueue_email(subject='Код доступа',
+                      message=f'Your confirmation code {confirmation_code}',
+                      from_email=HOST_EMAIL,
+                      recipient_list=[email])
     return Response(serializer.data, status=HTTP_200_OK)
 
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([TokenIPThrottle, TokenUsernameThrottle])
 def get_token(request):
     """Получение токена."""
     serializer = TokenSerializer(data=request.data)
@@ -102,24 +145,51 @@ def get_token(request):
     return Response({'token': token}, status=HTTP_200_OK)
 
 
+@api_view(['GET'])
+@permission_classes([IsAdminRole])
+def metrics(request):
+    """Метрики запросов в формате Prometheus. Доступ Админ."""
+    return HttpResponse(
+        registry.render(), content_type='text/plain; version=0.0.4')
+
+
 class GenreViewSet(AdminOrReadyViewSet):
     """Получить список всех жанров. Доступно без токена."""
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
+    response_cache_tags = ('genres',)
 
 
 class CategoryViewSet(AdminOrReadyViewSet):
     """Получить список всех категорий. Доступно без токена."""
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    response_cache_tags = ('categories',)
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(AnonymousResponseCacheMixin, ConditionalGetMixin,
+                   SparseFieldsMixin, viewsets.ModelViewSet):
     """Получить список всех произведений. Доступно без токена."""
-    queryset = Title.objects.all().annotate(rating=Avg('reviews__score'))
+    queryset = Title.objects.select_related(
+        'category').prefetch_related('genre')
     permission_classes = (IsAnyIsAdmin,)
-    filter_backends = (DjangoFilterBackend, )
+    filter_backends = (DjangoFilterBackend, StableOrderingFilter)
     filterset_class = TitlesFilter
+    ordering_fields = ('rating', 'year', 'name', 'id')
+    ordering = ('id',)
+    pagination_class = LimitOffsetOrCursorPagination
+    cursor_ordering = ('id',)
+    response_cache_tags = ('titles',)
+    sparse_fields = {
+        'id': ('id',),
+        'name': ('name',),
+        'year': ('year',),
+        'rating': ('rating',),
+        'reviews_count': ('reviews_count',),
+        'description': ('description',),
+        'genre': ('genre',),
+        'category': ('category__name', 'category__slug'),
+    }
     http_method_names = ('get', 'post', 'patch', 'delete')
 
     def get_serializer_class(self):
@@ -128,38 +198,81 @@ class TitleViewSet(viewsets.ModelViewSet):
         return TitleReadSerializer
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(ConditionalGetMixin, SparseFieldsMixin,
+                    viewsets.ModelViewSet):
     """Получение списка всех отзывов. Доступно без токена."""
     serializer_class = ReviewSerializer
     permission_classes = (IsAuthorActionOrAdminOrModeratorOrReadOnly,)
+    pagination_class = LimitOffsetOrCursorPagination
+    cursor_ordering = ('pub_date', 'id')
     http_method_names = ('get', 'post', 'patch', 'delete')
+    sparse_fields = {
+        'id': ('id',),
+        'text': ('text',),
+        'author': ('author__username',),
+        'score': ('score',),
+        'pub_date': ('pub_date',),
+        'comments_count': ('comments_count',),
+    }
+
+    def get_title(self):
+        """Произведение из URL; загружается один раз за запрос."""
+        if not hasattr(self, '_title'):
+            self._title = get_object_or_404(
+                Title.objects.only('pk'), pk=self.kwargs.get('title_id'))
+        return self._title
 
     def get_queryset(self):
-        title_id = self.kwargs.get('title_id')
-        title = get_object_or_404(Title, pk=title_id)
-        return title.reviews.all()
+        return Review.objects.filter(
+            title_id=self.kwargs.get('title_id')).select_related('author')
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        if not self.collection_found:
+            # Отзывов нет: отличить произведение без отзывов
+            # от несуществующего.
+            self.get_title()
+        return response
 
     def perform_create(self, serializer):
-        title_id = self.kwargs.get('title_id')
-        serializer.save(author=self.request.user,
-                        title=get_object_or_404(Title, pk=title_id))
+        serializer.save(author=self.request.user, title=self.get_title())
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(ConditionalGetMixin, SparseFieldsMixin,
+                     viewsets.ModelViewSet):
     """Получение списка всех комментариев. Доступно без токена."""
     serializer_class = CommentSerializer
     permission_classes = (IsAuthorActionOrAdminOrModeratorOrReadOnly,)
+    pagination_class = LimitOffsetOrCursorPagination
+    cursor_ordering = ('pub_date', 'id')
     http_method_names = ('get', 'post', 'patch', 'delete')
+    sparse_fields = {
+        'id': ('id',),
+        'text': ('text',),
+        'author': ('author__username',),
+        'pub_date': ('pub_date',),
+    }
 
     def get_review(self):
-        title_id = self.kwargs.get('title_id')
-        review_id = self.kwargs.get('review_id')
-        review = get_object_or_404(Review, id=review_id, title_id=title_id)
-        return review
+        """Отзыв из URL, принадлежащий произведению из URL."""
+        return get_object_or_404(
+            Review.objects.only('pk'),
+            pk=self.kwargs.get('review_id'),
+            title_id=self.kwargs.get('title_id'))
 
     def get_queryset(self):
-        review = self.get_review()
-        return review.comments.all()
+        return Comment.objects.filter(
+            review_id=self.kwargs.get('review_id'),
+            review__title_id=self.kwargs.get('title_id'),
+        ).select_related('author')
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        if not self.collection_found:
+            # Комментариев нет: отличить отзыв без комментариев
+            # от несуществующего.
+            self.get_review()
+        return response
 
     def perform_create(self, serializer):
         serializer.save(
@@ -1,12 +1,13 @@
-from rest_framework.filters import SearchFilter
-
 from .permissions import IsAnyIsAdmin
+from api.filters import SearchKeyFilter
 from api.mixins import CreateListDestroyViewSet
+from api.response_cache import AnonymousResponseCacheMixin
 
 
-class AdminOrReadyViewSet(CreateListDestroyViewSet):
+class AdminOrReadyViewSet(AnonymousResponseCacheMixin,
+                          CreateListDestroyViewSet):
     """Кастомный вьюсет для Genre и Category."""
     permission_classes = (IsAnyIsAdmin,)
-    filter_backends = (SearchFilter,)
-    search_fields = ('name', )
+    filter_backends = (SearchKeyFilter,)
+    search_key_field = 'search_name'
     lookup_field = 'slug'
@@ -29,6 +29,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.metrics.MetricsMiddleware',
+    'api.slow_queries.SlowQueryMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -66,6 +68,9 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Тестовая база в файле, а не в памяти: в общей памяти SQLite
+        # параллельные соединения не ждут блокировок, а сразу падают.
+        'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
     }
 }
 
@@ -117,12 +122,20 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 10,
 
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.CachedJWTAuthentication',
     ],
 
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend'
     ],
+
+    # Ёмкость корзины токенов и период её полного наполнения.
+    'DEFAULT_THROTTLE_RATES': {
+        'signup_ip': '30/hour',
+        'signup_username': '10/hour',
+        'token_ip': '60/hour',
+        'token_username': '10/hour',
+    },
 }
 
 SIMPLE_JWT = {
@@ -130,6 +143,9 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+# Сколько секунд кешируются роль и статус пользователя из JWT.
+JWT_USER_CACHE_TIMEOUT = 60
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = 'users.User'
@@ -145,3 +161,44 @@ MAX_LENGTH_FOR_SLUG_FIELD = 50
 MAX_LENGTH_FIELD_150 = 150
 
 HOST_EMAIL = 'admin@yamdb.ru'
+
+# Очередь писем: число попыток и паузы между ними, с.
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+
+EMAIL_OUTBOX_BACKOFF = 30
+
+EMAIL_OUTBOX_MAX_BACKOFF = 3600
+
+# На сколько секунд воркер забирает пачку писем; если он упадёт,
+# письма вернутся в очередь по истечении этого срока.
+EMAIL_OUTBOX_LEASE = 300
+
+# Кеш ответов для анонимных запросов к каталогу. LocMemCache у каждого
+# процесса свой; чтобы сброс по сигналам видели все процессы, нужен
+# общий кеш, например
+# {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+#  'LOCATION': BASE_DIR / 'cache'}
+# или DatabaseCache (таблица создаётся командой createcachetable).
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'responses': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'responses',
+    },
+}
+
+RESPONSE_CACHE_ALIAS = 'responses'
+
+# Время жизни ответа в кеше, с; 0 — не кешировать.
+RESPONSE_CACHE_TIMEOUT = 300
+
+# Порог журнала медленных SQL-запросов, мс; None — журнал выключен.
+SLOW_QUERY_THRESHOLD_MS = None
+
+SLOW_QUERY_LOG_FILE = BASE_DIR / 'logs' / 'slow_queries.log'
+
+SLOW_QUERY_LOG_MAX_BYTES = 5 * 1024 * 1024
+
+SLOW_QUERY_LOG_BACKUP_COUNT = 3
@@ -0,0 +1,117 @@
+import csv
+import datetime as dt
+import gzip
+import time
+from contextlib import contextmanager, nullcontext
+
+from django.conf import settings
+from django.core.management import BaseCommand
+from django.db import connection, transaction
+
+from reviews.management.commands.import_db import LIB
+from reviews.models import Title
+
+EXPORT_DIR = settings.BASE_DIR / 'export'
+CHUNK_SIZE = 2000
+
+# Столбцы CSV, которые хранятся в моделях под другими именами.
+COLUMN_FIELDS = {
+    'author': 'author_id',
+    'category': 'category_id',
+}
+# Необязательные для import_db столбцы, которые тоже стоит выгрузить.
+EXTRA_COLUMNS = {
+    Title: ('description',),
+}
+
+
+def to_csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, dt.datetime):
+        value = value.astimezone(dt.timezone.utc)
+        return value.isoformat(timespec='milliseconds').replace(
+            '+00:00', 'Z')
+    return value
+
+
+def open_output(path, compress):
+    if compress:
+        return gzip.open(
+            path.with_name(path.name + '.gz'), 'wt', encoding='utf-8',
+            newline='')
+    return open(path, 'w', encoding='utf-8', newline='')
+
+
+@contextmanager
+def snapshot():
+    """Транзакция, в которой все таблицы читаются из одного состояния."""
+    with transaction.atomic():
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, '
+                    'READ ONLY')
+        yield
+
+
+def export_table(table, path, compress, chunk_size):
+    columns = table.columns + EXTRA_COLUMNS.get(table.model, ())
+    fields = [COLUMN_FIELDS.get(column, column) for column in columns]
+    rows = table.model.objects.order_by('pk').values_list(*fields)
+    count = 0
+    with open_output(path, compress) as file:
+        writer = csv.writer(file)
+        writer.writerow(columns)
+        for row in rows.iterator(chunk_size=chunk_size):
+            writer.writerow(map(to_csv_value, row))
+            count += 1
+    return count
+
+
+def export_csv_db(output_dir=EXPORT_DIR, compress=False,
+                  consistent=False, chunk_size=CHUNK_SIZE, report=print):
+    output_dir.mkdir(parents=True, exist_ok=True)
+    with snapshot() if consistent else nullcontext():
+        for table in LIB:
+            started = time.perf_counter()
+            count = export_table(
+                table, output_dir / table.file_name, compress, chunk_size)
+            report(
+                f'{table.file_name}: выгружено строк {count} '
+                f'за {time.perf_counter() - started:.2f} с.'
+            )
+
+
+class Command(BaseCommand):
+    help = 'Выгрузить базу данных в CSV-файлы в формате import_db.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output-dir',
+            default=EXPORT_DIR,
+            type=lambda value: settings.BASE_DIR / value,
+            help='Каталог для CSV-файлов.',
+        )
+        parser.add_argument(
+            '--gzip',
+            action='store_true',
+            help='Сжимать файлы gzip.',
+        )
+        parser.add_argument(
+            '--snapshot',
+            action='store_true',
+            help='Читать все таблицы в одной транзакции.',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            default=CHUNK_SIZE,
+            type=int,
+            help='Число строк, читаемых из базы за один раз.',
+        )
+
+    def handle(self, *args, **options):
+        export_csv_db(
+            options['output_dir'], options['gzip'], options['snapshot'],
+            options['chunk_size'], self.stdout.write)
+        self.stdout.write(f'Данные выгружены в {options["output_dir"]}')
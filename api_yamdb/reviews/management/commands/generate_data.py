@@ -0,0 +1,260 @@
+import datetime as dt
+import random
+import time
+
+from django.core.management import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+
+from api.response_cache import CATALOG_TAGS, invalidate_cached_responses
+from reviews.csv_reader import batched
+from reviews.management.commands.import_db import (bulk_load_pragmas,
+                                                   keep_auto_now_add)
+from reviews.models import Category, Comment, Genre, Review, Title
+from users.models import User
+
+BATCH_SIZE = 5000
+# Даты отзывов и годы произведений отсчитываются от фиксированной даты,
+# а не от текущего времени, чтобы набор зависел только от `--seed`.
+ANCHOR_DATE = dt.date(2024, 1, 1)
+
+ADJECTIVES = (
+    'Тихий', 'Последний', 'Зелёный', 'Далёкий', 'Белый', 'Тёмный',
+    'Весёлый', 'Старый', 'Новый', 'Красный', 'Silent', 'Golden', 'Lost',
+)
+NOUNS = (
+    'дон', 'берег', 'сад', 'город', 'путь', 'ветер', 'огонь', 'дом',
+    'лес', 'океан', 'river', 'garden', 'empire', 'night',
+)
+WORDS = (
+    'фильм', 'книга', 'сюжет', 'герой', 'финал', 'музыка', 'актёр',
+    'история', 'жанр', 'сцена', 'автор', 'смысл', 'отлично', 'скучно',
+    'ёлка', 'эпизод', 'great', 'boring', 'story', 'plot',
+)
+
+
+def next_id(model):
+    return (model.objects.aggregate(max_id=Max('pk'))['max_id'] or 0) + 1
+
+
+def words(rng, count):
+    return ' '.join(rng.choice(WORDS) for _ in range(count))
+
+
+def zipf_counts(rng, items, total, skew):
+    """Распределить `total` по `items` штукам по закону Ципфа.
+
+    Первый элемент самый популярный; дробные части округляются
+    случайно, поэтому сумма равна `total` в среднем.
+    """
+    norm = sum(rank ** -skew for rank in range(1, items + 1))
+    for rank in range(1, items + 1):
+        yield int(total * rank ** -skew / norm + rng.random())
+
+
+class Generator:
+    """Генератор согласованного набора данных заданного размера."""
+
+    def __init__(self, seed, batch_size, anchor_date=ANCHOR_DATE):
+        self.rng = random.Random(seed)
+        self.batch_size = batch_size
+        self.anchor = dt.datetime.combine(
+            anchor_date, dt.time(), tzinfo=dt.timezone.utc)
+
+    def random_date(self):
+        return self.anchor - dt.timedelta(
+            seconds=self.rng.randrange(5 * 365 * 24 * 3600))
+
+    def insert(self, model, objects):
+        count = 0
+        with keep_auto_now_add(model):
+            for batch in batched(objects, self.batch_size):
+                model.objects.bulk_create(batch)
+                count += len(batch)
+        return count
+
+    def users(self, count):
+        first_id = next_id(User)
+        roles = (User.USER,) * 98 + (User.MODERATOR, User.ADMIN)
+
+        def build():
+            for pk in range(first_id, first_id + count):
+                user = User(
+                    id=pk,
+                    username=f'user{pk}',
+                    email=f'user{pk}@yamdb.fake',
+                    password='!',
+                    role=self.rng.choice(roles),
+                )
+                user.fill_search_key()
+                yield user
+
+        self.insert(User, build())
+        return range(first_id, first_id + count)
+
+    def named(self, model, count, prefix):
+        first_id = next_id(model)
+
+        def build():
+            for pk in range(first_id, first_id + count):
+                obj = model(
+                    id=pk,
+                    name=f'{self.rng.choice(ADJECTIVES)} {prefix} {pk}',
+                    slug=f'{prefix}-{pk}',
+                )
+                obj.fill_search_key()
+                yield obj
+
+        self.insert(model, build())
+        return range(first_id, first_id + count)
+
+    def titles(self, count, reviews, skew, user_ids, category_ids,
+               genre_ids):
+        """Создать произведения вместе с их жанрами и отзывами.
+
+        Отзывы генерируются сразу для каждого произведения, поэтому его
+        рейтинг известен до вставки, а авторы внутри произведения
+        не повторяются.
+        """
+        title_id = next_id(Title)
+        link_id = next_id(Title.genre.through)
+        review_id = next_id(Review)
+        first_review_id = review_id
+        current_year = self.anchor.year
+        counts = zipf_counts(self.rng, count, reviews, skew)
+        for chunk in batched(counts, self.batch_size):
+            titles, links, chunk_reviews = [], [], []
+            for reviews_count in chunk:
+                reviews_count = min(reviews_count, len(user_ids))
+                scores = [
+                    min(10, max(1, round(self.rng.gauss(7, 2))))
+                    for _ in range(reviews_count)
+                ]
+                authors = self.rng.sample(user_ids, reviews_count)
+                for author_id, score in zip(authors, scores):
+                    chunk_reviews.append(Review(
+                        id=review_id,
+                        title_id=title_id,
+                        author_id=author_id,
+                        score=score,
+                        text=words(self.rng, self.rng.randint(5, 60)),
+                        pub_date=self.random_date(),
+                    ))
+                    review_id += 1
+                for genre_id in self.rng.sample(
+                        genre_ids, min(len(genre_ids),
+                                       self.rng.randint(1, 3))):
+                    links.append(Title.genre.through(
+                        id=link_id, title_id=title_id, genre_id=genre_id))
+                    link_id += 1
+                titles.append(Title(
+                    id=title_id,
+                    name=(f'{self.rng.choice(ADJECTIVES)} '
+                          f'{self.rng.choice(NOUNS)} {title_id}'),
+                    year=self.rng.randint(1900, current_year),
+                    description=words(self.rng, self.rng.randint(0, 30)),
+                    category_id=(
+                        self.rng.choice(category_ids) if category_ids
+                        else None),
+                    score_sum=sum(scores),
+                    reviews_count=reviews_count,
+                    rating=Title.calculate_rating(sum(scores), reviews_count),
+                ))
+                title_id += 1
+            self.insert(Title, titles)
+            self.insert(Title.genre.through, links)
+            self.insert(Review, chunk_reviews)
+        return range(first_review_id, review_id)
+
+    def comments(self, count, skew, user_ids, review_ids):
+        """Создать комментарии, сосредоточенные на популярных отзывах."""
+        if not review_ids:
+            return 0
+        first_id = next_id(Comment)
+        # u ** (1 + skew) смещает выбор к началу диапазона, где лежат
+        # отзывы самых популярных произведений.
+        exponent = 1 + skew
+
+        def build():
+            for pk in range(first_id, first_id + count):
+                index = int(len(review_ids) * self.rng.random() ** exponent)
+                yield Comment(
+                    id=pk,
+                    review_id=review_ids[index],
+                    author_id=self.rng.choice(user_ids),
+                    text=words(self.rng, self.rng.randint(3, 30)),
+                    pub_date=self.random_date(),
+                )
+
+        inserted = self.insert(Comment, build())
+        Review.objects.filter(
+            pk__gte=review_ids[0], pk__lte=review_ids[-1]
+        ).refresh_comments_count()
+        return inserted
+
+
+def generate_data(users, categories, genres, titles, reviews, comments,
+                  seed=0, skew=1.0, batch_size=BATCH_SIZE, report=print,
+                  anchor_date=ANCHOR_DATE):
+    generator = Generator(seed, batch_size, anchor_date)
+    with bulk_load_pragmas(), transaction.atomic():
+        started = time.perf_counter()
+        user_ids = generator.users(users)
+        category_ids = generator.named(Category, categories, 'category')
+        genre_ids = generator.named(Genre, genres, 'genre')
+        report(
+            'Пользователи, категории и жанры: '
+            f'{time.perf_counter() - started:.2f} с.')
+        started = time.perf_counter()
+        review_ids = generator.titles(
+            titles, reviews, skew, user_ids, category_ids, genre_ids)
+        report(
+            f'Произведения и отзывы: {time.perf_counter() - started:.2f} с.')
+        started = time.perf_counter()
+        comments_count = generator.comments(
+            comments, skew, user_ids, review_ids)
+        report(f'Комментарии: {time.perf_counter() - started:.2f} с.')
+    invalidate_cached_responses(*CATALOG_TAGS)
+    report(
+        f'Создано: пользователей {len(user_ids)}, произведений {titles}, '
+        f'отзывов {len(review_ids)}, комментариев {comments_count}.'
+    )
+
+
+class Command(BaseCommand):
+    help = 'Сгенерировать воспроизводимый набор данных для нагрузочных тестов.'
+
+    def add_arguments(self, parser):
+        for name, default, help_text in (
+            ('users', 1000, 'Число пользователей.'),
+            ('categories', 10, 'Число категорий.'),
+            ('genres', 30, 'Число жанров.'),
+            ('titles', 1000, 'Число произведений.'),
+            ('reviews', 10000, 'Примерное число отзывов.'),
+            ('comments', 20000, 'Число комментариев.'),
+            ('seed', 0, 'Начальное значение генератора случайных чисел.'),
+            ('batch-size', BATCH_SIZE, 'Число строк в одном INSERT.'),
+        ):
+            parser.add_argument(
+                f'--{name}', default=default, type=int, help=help_text)
+        parser.add_argument(
+            '--skew',
+            default=1.0,
+            type=float,
+            help='Показатель закона Ципфа для популярности произведений.',
+        )
+        parser.add_argument(
+            '--anchor-date',
+            default=ANCHOR_DATE,
+            type=dt.date.fromisoformat,
+            help='Дата ГГГГ-ММ-ДД, от которой отсчитываются даты отзывов.',
+        )
+
+    def handle(self, *args, **options):
+        generate_data(
+            options['users'], options['categories'], options['genres'],
+            options['titles'], options['reviews'], options['comments'],
+            seed=options['seed'], skew=options['skew'],
+            batch_size=options['batch_size'], report=self.stdout.write,
+            anchor_date=options['anchor_date'],
+        )
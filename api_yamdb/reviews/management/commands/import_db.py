@@ -1,88 +1,606 @@
-import csv
+import time
+from collections import defaultdict, namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
 
-from django.core.management import BaseCommand
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+from django.db import IntegrityError, connection, connections, transaction
+from django.db.models import Case, IntegerField, Value, When
+from django.utils import timezone
 
-from reviews.models import Category, Comment, Genre, Review, Title
+from api.response_cache import CATALOG_TAGS, invalidate_cached_responses
+from reviews.csv_reader import (batched, file_digest, parse_csv, read_rows,
+                                row_digest)
+from reviews.management.commands.recount_ratings import (
+    recount_comments, recount_ratings)
+from reviews.models import (Category, Comment, Genre, ImportFileChecksum,
+                            ImportRowChecksum, Review, Title)
+from users.authentication import forget_identities
 from users.models import User
 
+DATA_DIR = settings.BASE_DIR / 'static' / 'data'
+BATCH_SIZE = 1000
+# Каждый id добавляет в UPDATE со счётчиками или список IN параметры,
+# пачка держит запрос в пределах лимита переменных SQLite.
+DELTA_BATCH_SIZE = 500
 
-def import_csv_db():
-    LIB = (
-        (User, 'static/data/users.csv'),
-        (Category, 'static/data/category.csv'),
-        (Genre, 'static/data/genre.csv'),
-        (Title, 'static/data/titles.csv'),
-        (Title.genre.through, 'static/data/genre_title.csv'),
-        (Review, 'static/data/review.csv'),
-        (Comment, 'static/data/comments.csv')
+# На время загрузки SQLite не ждёт сброса на диск после каждой записи.
+BULK_LOAD_PRAGMAS = {
+    'synchronous': 'OFF',
+    'temp_store': 'MEMORY',
+    'cache_size': -256 * 1024,
+}
+
+
+def user_from_row(row):
+    user = User(
+        id=row['id'],
+        username=row['username'],
+        email=row['email'],
+        role=row['role'],
+        bio=row['bio'],
+        first_name=row['first_name'],
+        last_name=row['last_name']
     )
+    user.fill_search_key()
+    return user
 
-    for model, file in LIB:
-        for row in csv.DictReader(open(file, encoding='utf-8')):
-            if file == 'static/data/users.csv':
-                p = model(
-                    id=row['id'],
-                    username=row['username'],
-                    email=row['email'],
-                    role=row['role'],
-                    bio=row['bio'],
-                    first_name=row['first_name'],
-                    last_name=row['last_name']
-                )
-                p.save()
-            elif (file == 'static/data/category.csv'
-                  or file == 'static/data/genre.csv'):
-                p = model(
-                    id=row['id'],
-                    name=row['name'],
-                    slug=row['slug']
-                )
-                p.save()
-            elif file == 'static/data/titles.csv':
-                p = model(
-                    id=row['id'],
-                    name=row['name'],
-                    year=row['year'],
-                    category=Category.objects.get(id=row['category'])
-                )
-                p.save()
-            elif file == 'static/data/genre_title.csv':
-                p = model(
-                    id=row['id'],
-                    title=Title.objects.get(id=row['title_id']),
-                    genre=Genre.objects.get(id=row['genre_id'])
-                )
-                p.save()
-            elif file == 'static/data/review.csv':
-                p = model(
-                    id=row['id'],
-                    title_id=row['title_id'],
-                    text=row['text'],
-                    author_id=row['author'],
-                    score=row['score'],
-                    pub_date=row['pub_date']
-                )
-                p.save()
-            elif file == 'static/data/comments.csv':
-                p = model(
-                    id=row['id'],
-                    review_id=row['review_id'],
-                    text=row['text'],
-                    author_id=row['author'],
-                    pub_date=row['pub_date']
+
+def category_from_row(row):
+    category = Category(id=row['id'], name=row['name'], slug=row['slug'])
+    category.fill_search_key()
+    return category
+
+
+def genre_from_row(row):
+    genre = Genre(id=row['id'], name=row['name'], slug=row['slug'])
+    genre.fill_search_key()
+    return genre
+
+
+def title_from_row(row):
+    return Title(
+        id=row['id'],
+        name=row['name'],
+        year=row['year'],
+        description=row.get('description') or None,
+        category_id=row['category'] or None
+    )
+
+
+def genre_title_from_row(row):
+    return Title.genre.through(
+        id=row['id'],
+        title_id=row['title_id'],
+        genre_id=row['genre_id']
+    )
+
+
+def review_from_row(row):
+    return Review(
+        id=row['id'],
+        title_id=row['title_id'],
+        text=row['text'],
+        author_id=row['author'],
+        score=int(row['score']),
+        pub_date=row['pub_date']
+    )
+
+
+def comment_from_row(row):
+    return Comment(
+        id=row['id'],
+        review_id=row['review_id'],
+        text=row['text'],
+        author_id=row['author'],
+        pub_date=row['pub_date']
+    )
+
+
+Table = namedtuple(
+    'Table', 'model file_name from_row columns update_fields')
+
+# Порядок важен: таблица загружается после тех, на которые ссылается.
+# columns — обязательные столбцы CSV, update_fields — поля, которые
+# перезаписываются при повторной загрузке.
+LIB = (
+    Table(User, 'users.csv', user_from_row, (
+        'id', 'username', 'email', 'role', 'bio', 'first_name', 'last_name'
+    ), (
+        'username', 'email', 'role', 'bio', 'first_name', 'last_name',
+        'username_search')),
+    Table(Category, 'category.csv', category_from_row, (
+        'id', 'name', 'slug'
+    ), (
+        'name', 'slug', 'search_name')),
+    Table(Genre, 'genre.csv', genre_from_row, (
+        'id', 'name', 'slug'
+    ), (
+        'name', 'slug', 'search_name')),
+    Table(Title, 'titles.csv', title_from_row, (
+        'id', 'name', 'year', 'category'
+    ), (
+        'name', 'year', 'description', 'category')),
+    Table(Title.genre.through, 'genre_title.csv', genre_title_from_row, (
+        'id', 'title_id', 'genre_id'
+    ), (
+        'title', 'genre')),
+    Table(Review, 'review.csv', review_from_row, (
+        'id', 'title_id', 'text', 'author', 'score', 'pub_date'
+    ), (
+        'title', 'text', 'author', 'score', 'pub_date')),
+    Table(Comment, 'comments.csv', comment_from_row, (
+        'id', 'review_id', 'text', 'author', 'pub_date'
+    ), (
+        'review', 'text', 'author', 'pub_date')),
+)
+
+
+def dependency_levels(tables):
+    """Разбить таблицы на уровни по графу внешних ключей моделей.
+
+    Таблицы одного уровня не ссылаются друг на друга, а только на
+    таблицы предыдущих уровней, поэтому их можно загружать одновременно.
+    """
+    models = {table.model for table in tables}
+    pending = {
+        table: {
+            field.related_model for field in table.model._meta.concrete_fields
+            if field.is_relation and field.related_model in models
+            and field.related_model is not table.model
+        }
+        for table in tables
+    }
+    levels = []
+    loaded = set()
+    while pending:
+        level = [
+            table for table, depends_on in pending.items()
+            if depends_on <= loaded
+        ]
+        if not level:
+            raise ValueError('Циклическая зависимость между таблицами.')
+        for table in level:
+            del pending[table]
+        loaded.update(table.model for table in level)
+        levels.append(level)
+    return levels
+
+
+@contextmanager
+def bulk_load_pragmas():
+    """Включить на время загрузки ускоряющие настройки SQLite."""
+    if connection.vendor != 'sqlite':
+        yield
+        return
+    with connection.cursor() as cursor:
+        previous = {}
+        for name, value in BULK_LOAD_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name}')
+            previous[name] = cursor.fetchone()[0]
+            cursor.execute(f'PRAGMA {name} = {value}')
+        try:
+            yield
+        finally:
+            for name, value in previous.items():
+                cursor.execute(f'PRAGMA {name} = {value}')
+
+
+@contextmanager
+def keep_auto_now_add(model):
+    """Сохранить даты из CSV вместо подстановки текущего времени."""
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False)
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def collect_rating_deltas(rating_deltas, reviews):
+    for review in reviews:
+        rating_delta = rating_deltas[review.title_id]
+        rating_delta[0] += review.score
+        rating_delta[1] += 1
+
+
+def delta_by_pk(deltas):
+    """Собрать CASE, выбирающий изменение счётчика по первичному ключу."""
+    return Case(
+        *(When(pk=pk, then=Value(delta)) for pk, delta in deltas),
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+
+
+def update_ratings(rating_deltas):
+    """Применить изменения рейтинга одним UPDATE на пачку произведений."""
+    for title_ids in batched(rating_deltas, DELTA_BATCH_SIZE):
+        Title.objects.filter(pk__in=title_ids).apply_review_delta(
+            delta_by_pk(
+                (pk, rating_deltas[pk][0]) for pk in title_ids),
+            delta_by_pk(
+                (pk, rating_deltas[pk][1]) for pk in title_ids),
+        )
+
+
+def collect_touched_titles(touched_titles, reviews, existing):
+    """Запомнить произведения, чей рейтинг изменят загружаемые отзывы."""
+    touched_titles.update(int(review.title_id) for review in reviews)
+    touched_titles.update(Review.objects.filter(
+        pk__in=existing).values_list('title_id', flat=True))
+
+
+def collect_comment_deltas(comment_deltas, comments):
+    for comment in comments:
+        comment_deltas[comment.review_id] += 1
+
+
+def update_comment_counts(comment_deltas):
+    """Применить изменения числа комментариев одним UPDATE на пачку."""
+    for review_ids in batched(comment_deltas, DELTA_BATCH_SIZE):
+        Review.objects.filter(pk__in=review_ids).apply_comment_delta(
+            delta_by_pk((pk, comment_deltas[pk]) for pk in review_ids))
+
+
+def collect_touched_reviews(touched_reviews, comments, existing):
+    """Запомнить отзывы, чьё число комментариев изменят загружаемые."""
+    touched_reviews.update(int(comment.review_id) for comment in comments)
+    touched_reviews.update(Comment.objects.filter(
+        pk__in=existing).values_list('review_id', flat=True))
+
+
+def collect_user_ids(user_ids, users, existing=None):
+    """Запомнить пользователей, чьи данные для JWT надо сбросить."""
+    user_ids.update(int(user.pk) for user in users)
+
+
+def collect_renamed_users(user_ids, renamed, users, existing):
+    """Запомнить изменённых пользователей и тех, у кого сменился username."""
+    users = list(users)
+    collect_user_ids(user_ids, users)
+    stored = dict(User.objects.filter(
+        pk__in=existing).values_list('pk', 'username'))
+    renamed.update(
+        int(user.pk) for user in users
+        if int(user.pk) in stored and stored[int(user.pk)] != user.username)
+
+
+def touch_posts_by_authors(author_ids):
+    """Отметить изменёнными отзывы и комментарии авторов, как при rename."""
+    now = timezone.now()
+    for ids in batched(sorted(author_ids), DELTA_BATCH_SIZE):
+        Review.objects.filter(author_id__in=ids).update(updated_at=now)
+        Comment.objects.filter(author_id__in=ids).update(updated_at=now)
+
+
+def collect_touched_by_catalog(touched, objects, existing):
+    """Запомнить изменённые жанры, категории или связи с жанрами."""
+    touched.update(
+        obj.title_id if hasattr(obj, 'title_id') else obj.pk
+        for obj in objects)
+
+
+# Как найти произведения, в представление которых входят изменённые
+# при загрузке объекты.
+TITLE_LOOKUPS = {
+    Genre: 'genre__in',
+    Category: 'category__in',
+    Title.genre.through: 'pk__in',
+}
+
+
+def save_row_checksums(table_name, digests, batch_size, replace=True):
+    """Заменить контрольные суммы строк с идентификаторами из `digests`.
+
+    При `replace=False` старые суммы не удаляются: полная загрузка
+    очищает их для всей таблицы заранее.
+    """
+    if replace:
+        ImportRowChecksum.objects.filter(
+            table=table_name, row_id__in=digests).delete()
+    ImportRowChecksum.objects.bulk_create(
+        (ImportRowChecksum(table=table_name, row_id=row_id, digest=digest)
+         for row_id, digest in digests.items()),
+        batch_size=batch_size,
+    )
+
+
+def import_table(table, rows, batch_size, on_batch=None):
+    """Загрузить строки CSV пачками по `batch_size` через INSERT.
+
+    `on_batch` получает список созданных объектов.
+    """
+    table_name = table.model._meta.db_table
+    ImportRowChecksum.objects.filter(table=table_name).delete()
+    count = 0
+    with keep_auto_now_add(table.model):
+        for rows in batched(rows, batch_size):
+            batch = [table.from_row(row) for row in rows]
+            table.model.objects.bulk_create(batch, batch_size=batch_size)
+            save_row_checksums(
+                table_name,
+                {int(row['id']): row_digest(row) for row in rows},
+                batch_size,
+                replace=False,
+            )
+            if on_batch is not None:
+                on_batch(batch)
+            count += len(batch)
+    return count
+
+
+def upsert_table(table, rows, batch_size, on_batch=None):
+    """Загрузить только новые и изменённые с прошлого раза строки.
+
+    Строка считается изменённой, если её контрольная сумма отличается от
+    сохранённой. Новые объекты вставляются, существующие — обновляются.
+    `on_batch` получает изменённые объекты и множество первичных ключей
+    тех из них, что уже есть в базе, до записи пачки.
+    """
+    model = table.model
+    table_name = model._meta.db_table
+    auto_now_fields = [
+        field.name for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False)
+    ]
+    count = 0
+    with keep_auto_now_add(model):
+        for rows in batched(rows, batch_size):
+            digests = {int(row['id']): row_digest(row) for row in rows}
+            stored = dict(ImportRowChecksum.objects.filter(
+                table=table_name, row_id__in=digests,
+            ).values_list('row_id', 'digest'))
+            changed = {
+                int(row['id']): table.from_row(row) for row in rows
+                if stored.get(int(row['id'])) != digests[int(row['id'])]
+            }
+            if not changed:
+                continue
+            existing = set(model.objects.filter(
+                pk__in=changed).values_list('pk', flat=True))
+            if on_batch is not None:
+                on_batch(changed.values(), existing)
+            model.objects.bulk_create(
+                [obj for pk, obj in changed.items() if pk not in existing],
+                batch_size=batch_size,
+            )
+            updated = [obj for pk, obj in changed.items() if pk in existing]
+            # bulk_update не заполняет поля auto_now.
+            now = timezone.now()
+            for obj in updated:
+                for field in auto_now_fields:
+                    setattr(obj, field, now)
+            model.objects.bulk_update(
+                updated,
+                (*table.update_fields, *auto_now_fields),
+                batch_size=batch_size,
+            )
+            save_row_checksums(
+                table_name,
+                {row_id: digests[row_id] for row_id in changed},
+                batch_size,
+            )
+            count += len(changed)
+    return count
+
+
+def load_changed_rows(table, rows, batch_size, user_ids):
+    """Загрузить изменённые строки и пересчитать зависящие от них данные."""
+    touched_titles = set()
+    touched_reviews = set()
+    touched_catalog = set()
+    renamed_users = set()
+    on_batch = None
+    if table.model is User:
+        on_batch = partial(collect_renamed_users, user_ids, renamed_users)
+    elif table.model is Review:
+        on_batch = partial(collect_touched_titles, touched_titles)
+    elif table.model is Comment:
+        on_batch = partial(collect_touched_reviews, touched_reviews)
+    elif table.model in TITLE_LOOKUPS:
+        on_batch = partial(collect_touched_by_catalog, touched_catalog)
+    count = upsert_table(table, rows, batch_size, on_batch)
+    for title_ids in batched(sorted(touched_titles), DELTA_BATCH_SIZE):
+        recount_ratings(Title.objects.filter(pk__in=title_ids))
+    for review_ids in batched(sorted(touched_reviews), DELTA_BATCH_SIZE):
+        recount_comments(Review.objects.filter(pk__in=review_ids))
+    for catalog_ids in batched(sorted(touched_catalog), DELTA_BATCH_SIZE):
+        Title.objects.filter(**{
+            TITLE_LOOKUPS[table.model]: catalog_ids}).touch()
+    touch_posts_by_authors(renamed_users)
+    return count
+
+
+def load_all_rows(table, rows, batch_size, user_ids):
+    """Загрузить все строки и посчитать рейтинг и число комментариев."""
+    rating_deltas = defaultdict(lambda: [0, 0])
+    comment_deltas = defaultdict(int)
+    on_batch = None
+    if table.model is User:
+        on_batch = partial(collect_user_ids, user_ids)
+    elif table.model is Review:
+        on_batch = partial(collect_rating_deltas, rating_deltas)
+    elif table.model is Comment:
+        on_batch = partial(collect_comment_deltas, comment_deltas)
+    count = import_table(table, rows, batch_size, on_batch)
+    update_ratings(rating_deltas)
+    update_comment_counts(comment_deltas)
+    return count
+
+
+def load_table(table, rows, digest, batch_size, incremental):
+    """Записать строки таблицы в одной транзакции, вернуть их число.
+
+    bulk_create и bulk_update не вызывают сигналы, поэтому всё, что
+    обычно делают обработчики сигналов, загрузка делает сама: считает
+    рейтинг и число комментариев, отмечает изменёнными зависящие
+    объекты и после фиксации сбрасывает кеш пользователей для JWT.
+    """
+    user_ids = set()
+    with transaction.atomic():
+        transaction.on_commit(partial(forget_identities, user_ids))
+        load = load_changed_rows if incremental else load_all_rows
+        count = load(table, rows, batch_size, user_ids)
+        ImportFileChecksum.objects.update_or_create(
+            table=table.model._meta.db_table, defaults={'digest': digest})
+    return count
+
+
+def known_digests(incremental):
+    if not incremental:
+        return {}
+    return dict(ImportFileChecksum.objects.values_list('table', 'digest'))
+
+
+def import_csv_db(data_dir=DATA_DIR, batch_size=BATCH_SIZE, report=print,
+                  incremental=False, workers=1):
+    if workers > 1:
+        return import_csv_db_parallel(
+            data_dir, batch_size, report, incremental, workers)
+    digests = known_digests(incremental)
+    with bulk_load_pragmas():
+        for table in LIB:
+            started = time.perf_counter()
+            path = data_dir / table.file_name
+            digest = file_digest(path)
+            if digest == digests.get(table.model._meta.db_table):
+                report(f'{table.file_name}: изменений нет.')
+                continue
+            count = load_table(
+                table, read_rows(path), digest, batch_size, incremental)
+            elapsed = time.perf_counter() - started
+            report(
+                f'{table.file_name}: загружено строк {count} '
+                f'за {elapsed:.2f} с '
+                f'({count / elapsed if elapsed else 0:.0f} строк/с).'
+            )
+    invalidate_cached_responses(*CATALOG_TAGS)
+
+
+def load_table_in_thread(table, rows, digest, batch_size, incremental):
+    try:
+        started = time.perf_counter()
+        count = load_table(table, rows, digest, batch_size, incremental)
+        return count, time.perf_counter() - started
+    finally:
+        # У каждого потока своё соединение с базой.
+        connections.close_all()
+
+
+def import_csv_db_parallel(data_dir, batch_size, report, incremental,
+                           workers):
+    """Загрузить таблицы, разбирая CSV в пуле процессов.
+
+    Все файлы разбираются и проверяются параллельно сразу после запуска,
+    запись идёт по уровням графа зависимостей. Таблицы одного уровня
+    записываются одновременно, если СУБД допускает параллельных
+    писателей; SQLite пишет их по очереди. В отличие от
+    последовательного режима, файл целиком держится в памяти.
+    """
+    started = time.perf_counter()
+    digests = known_digests(incremental)
+    concurrent_writes = connection.vendor != 'sqlite'
+    parse_seconds = write_seconds = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool, \
+            bulk_load_pragmas():
+        parsed = {
+            table: pool.submit(
+                parse_csv, data_dir / table.file_name, table.columns,
+                digests.get(table.model._meta.db_table))
+            for table in LIB
+        }
+        for level in dependency_levels(LIB):
+            jobs = {}
+            for table in level:
+                rows, digest, seconds = parsed[table].result()
+                parse_seconds += seconds
+                if rows is None:
+                    report(f'{table.file_name}: изменений нет.')
+                    continue
+                jobs[table] = (rows, digest)
+            if concurrent_writes:
+                with ThreadPoolExecutor(max_workers=workers) as threads:
+                    results = {
+                        table: threads.submit(
+                            load_table_in_thread, table, rows, digest,
+                            batch_size, incremental)
+                        for table, (rows, digest) in jobs.items()
+                    }
+                    results = {
+                        table: future.result()
+                        for table, future in results.items()
+                    }
+            else:
+                results = {}
+                for table, (rows, digest) in jobs.items():
+                    table_started = time.perf_counter()
+                    count = load_table(
+                        table, rows, digest, batch_size, incremental)
+                    results[table] = (
+                        count, time.perf_counter() - table_started)
+            for table, (count, seconds) in results.items():
+                write_seconds += seconds
+                report(
+                    f'{table.file_name}: записано строк {count} '
+                    f'за {seconds:.2f} с.'
                 )
-                p.save()
-        print(f"Загрузка данных из таблицы {file} завершена успешно.")
+    report(
+        f'Разбор CSV: {parse_seconds:.2f} с в {workers} процессах, '
+        f'запись: {write_seconds:.2f} с, '
+        f'всего: {time.perf_counter() - started:.2f} с.'
+    )
+    invalidate_cached_responses(*CATALOG_TAGS)
 
 
 class Command(BaseCommand):
+    help = 'Загрузить данные из CSV-файлов в базу данных.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--data-dir',
+            default=DATA_DIR,
+            type=lambda value: settings.BASE_DIR / value,
+            help='Каталог с CSV-файлами.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            default=BATCH_SIZE,
+            type=int,
+            help='Число строк в одном INSERT.',
+        )
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help='Загрузить только строки, изменившиеся с прошлого запуска.',
+        )
+        parser.add_argument(
+            '--workers',
+            default=1,
+            type=int,
+            help='Число процессов для разбора CSV; 1 — потоковая загрузка.',
+        )
+
     def handle(self, *args, **options):
-        print('Начало загрузки данных в базу данных')
+        self.stdout.write('Начало загрузки данных в базу данных')
         try:
-            import_csv_db()
-
+            import_csv_db(
+                options['data_dir'], options['batch_size'], self.stdout.write,
+                options['incremental'], options['workers'])
+        except IntegrityError as error:
+            message = f'Сбой в работе импорта: {error}.'
+            if not options['incremental']:
+                message += (
+                    ' Для повторной загрузки в непустую базу '
+                    'используйте --incremental.')
+            raise CommandError(message)
         except Exception as error:
-            print(f"Сбой в работе импорта: {error}.")
-
-        finally:
-            print('Загрузка всех данных произведена успешно')
+            raise CommandError(f'Сбой в работе импорта: {error}.')
+        self.stdout.write('Загрузка всех данных произведена успешно')
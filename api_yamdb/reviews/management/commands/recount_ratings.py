@@ -0,0 +1,132 @@
+from django.core.management import BaseCommand, CommandError
+from django.utils import timezone
+
+from api.response_cache import invalidate_cached_responses
+from reviews.models import Review, Title
+
+BATCH_SIZE = 500
+
+
+def drifted_in_batches(queryset, is_drifted):
+    """Выдавать пачки расходящихся объектов, читая их по первичному ключу.
+
+    Каждая пачка читается отдельным запросом после записи предыдущей,
+    поэтому чтение не пересекается с bulk_update.
+    """
+    last_pk = None
+    while True:
+        page = queryset.order_by('pk')
+        if last_pk is not None:
+            page = page.filter(pk__gt=last_pk)
+        page = list(page[:BATCH_SIZE])
+        if not page:
+            return
+        last_pk = page[-1].pk
+        yield [obj for obj in page if is_drifted(obj)]
+
+
+def title_drifted(title):
+    """Исправить агрегаты произведения в памяти при расхождении."""
+    rating = Title.calculate_rating(
+        title.actual_score_sum, title.actual_reviews_count)
+    if (title.score_sum == title.actual_score_sum
+            and title.reviews_count == title.actual_reviews_count
+            and title.rating == rating):
+        return False
+    title.score_sum = title.actual_score_sum
+    title.reviews_count = title.actual_reviews_count
+    title.rating = rating
+    title.updated_at = timezone.now()
+    return True
+
+
+def review_drifted(review):
+    """Исправить число комментариев отзыва в памяти при расхождении."""
+    if review.comments_count == review.actual_comments_count:
+        return False
+    review.comments_count = review.actual_comments_count
+    review.updated_at = timezone.now()
+    return True
+
+
+def recount_ratings(titles=None, fix=True, report=None):
+    """Сверить сохранённые агрегаты рейтинга с таблицей отзывов.
+
+    Расходящиеся произведения передаются в `report` и при `fix`
+    сохраняются пачками. Возвращает число расхождений.
+    """
+    if titles is None:
+        titles = Title.objects.all()
+    count = 0
+    for drifted in drifted_in_batches(
+            titles.with_actual_rating(), title_drifted):
+        for title in drifted:
+            if report is not None:
+                report(title)
+        if fix and drifted:
+            Title.objects.bulk_update(
+                drifted,
+                ('score_sum', 'reviews_count', 'rating', 'updated_at'))
+        count += len(drifted)
+    if fix and count:
+        invalidate_cached_responses('titles')
+    return count
+
+
+def recount_comments(reviews=None, fix=True, report=None):
+    """Сверить сохранённое число комментариев отзывов с таблицей.
+
+    Работает как recount_ratings, возвращает число расхождений.
+    """
+    if reviews is None:
+        reviews = Review.objects.all()
+    count = 0
+    for drifted in drifted_in_batches(
+            reviews.with_actual_comments_count(), review_drifted):
+        for review in drifted:
+            if report is not None:
+                report(review)
+        if fix and drifted:
+            Review.objects.bulk_update(
+                drifted, ('comments_count', 'updated_at'))
+        count += len(drifted)
+    return count
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитать сумму оценок, число отзывов и рейтинг произведений '
+        'и число комментариев отзывов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Только показать расхождения, не исправляя их.',
+        )
+
+    def report_title(self, title):
+        self.stdout.write(
+            f'{title.pk}: {title.name} — '
+            f'рейтинг {title.rating}, отзывов {title.reviews_count}'
+        )
+
+    def report_review(self, review):
+        self.stdout.write(
+            f'Отзыв {review.pk}: комментариев {review.comments_count}')
+
+    def handle(self, *args, **options):
+        drifted = recount_ratings(
+            fix=not options['check'], report=self.report_title)
+        drifted_reviews = recount_comments(
+            fix=not options['check'], report=self.report_review)
+        if options['check']:
+            total = drifted + drifted_reviews
+            if total:
+                raise CommandError(f'Расхождений найдено: {total}.')
+            self.stdout.write('Расхождений не найдено.')
+        else:
+            self.stdout.write(
+                f'Исправлено произведений: {drifted}, '
+                f'отзывов: {drifted_reviews}.')
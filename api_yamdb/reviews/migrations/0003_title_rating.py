@@ -0,0 +1,43 @@
+# Generated by Django 3.2 on 2026-10-18 05:30
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def fill_title_rating(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    titles = Title.objects.annotate(
+        actual_score_sum=Sum('reviews__score'),
+        actual_reviews_count=Count('reviews'),
+    ).filter(actual_reviews_count__gt=0)
+    for title in titles.iterator():
+        title.score_sum = title.actual_score_sum
+        title.reviews_count = title.actual_reviews_count
+        title.rating = title.score_sum // title.reviews_count
+        title.save(update_fields=('score_sum', 'reviews_count', 'rating'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='rating',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True, verbose_name='Рейтинг'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='reviews_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество отзывов'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_sum',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Сумма оценок'),
+        ),
+        migrations.RunPython(fill_title_rating, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,94 @@
+# Generated by Django 3.2 on 2026-10-18 05:33
+
+from django.db import migrations, models
+import django.db.models.deletion
+import reviews.search
+
+
+def normalized(column):
+    # unicode61 сам приводит регистр, но не отождествляет ё и е.
+    return (
+        f"replace(replace(coalesce({column}, ''), 'ё', 'е'), 'Ё', 'Е')"
+    )
+
+
+FTS_SQL = (
+    """
+    CREATE VIRTUAL TABLE reviews_title_fts USING fts5(
+        name, description, content='',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER reviews_title_fts_ai AFTER INSERT ON reviews_title BEGIN
+        INSERT INTO reviews_title_fts (rowid, name, description)
+        VALUES (new.id, {normalized('new.name')},
+                {normalized('new.description')});
+    END
+    """,
+    f"""
+    CREATE TRIGGER reviews_title_fts_ad AFTER DELETE ON reviews_title BEGIN
+        INSERT INTO reviews_title_fts (
+            reviews_title_fts, rowid, name, description)
+        VALUES ('delete', old.id, {normalized('old.name')},
+                {normalized('old.description')});
+    END
+    """,
+    f"""
+    CREATE TRIGGER reviews_title_fts_au
+    AFTER UPDATE OF name, description ON reviews_title BEGIN
+        INSERT INTO reviews_title_fts (
+            reviews_title_fts, rowid, name, description)
+        VALUES ('delete', old.id, {normalized('old.name')},
+                {normalized('old.description')});
+        INSERT INTO reviews_title_fts (rowid, name, description)
+        VALUES (new.id, {normalized('new.name')},
+                {normalized('new.description')});
+    END
+    """,
+    f"""
+    INSERT INTO reviews_title_fts (rowid, name, description)
+    SELECT id, {normalized('name')}, {normalized('description')}
+    FROM reviews_title
+    """,
+)
+
+DROP_FTS_SQL = (
+    'DROP TRIGGER IF EXISTS reviews_title_fts_ai',
+    'DROP TRIGGER IF EXISTS reviews_title_fts_ad',
+    'DROP TRIGGER IF EXISTS reviews_title_fts_au',
+    'DROP TABLE IF EXISTS reviews_title_fts',
+)
+
+
+def run_on_sqlite(statements):
+    def operation(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleSearch',
+            fields=[
+                ('title', models.OneToOneField(db_column='rowid', on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search', serialize=False, to='reviews.title')),
+                ('document', reviews.search.FullTextField(db_column='reviews_title_fts')),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'reviews_title_fts',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(
+            run_on_sqlite(FTS_SQL), run_on_sqlite(DROP_FTS_SQL)),
+    ]
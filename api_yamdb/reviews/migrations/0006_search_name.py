@@ -0,0 +1,34 @@
+# Generated by Django 3.2 on 2026-10-18 05:34
+
+from django.db import migrations, models
+
+from reviews.search import normalize_search_text
+
+
+def fill_search_name(apps, schema_editor):
+    for model_name in ('Category', 'Genre'):
+        model = apps.get_model('reviews', model_name)
+        for obj in model.objects.only('id', 'name').iterator():
+            obj.search_name = normalize_search_text(obj.name)
+            obj.save(update_fields=('search_name',))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_title_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='search_name',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=256, verbose_name='Ключ поиска'),
+        ),
+        migrations.AddField(
+            model_name='genre',
+            name='search_name',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=256, verbose_name='Ключ поиска'),
+        ),
+        migrations.RunPython(fill_search_name, migrations.RunPython.noop),
+    ]
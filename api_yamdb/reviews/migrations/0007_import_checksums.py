@@ -0,0 +1,43 @@
+# Generated by Django 3.2 on 2026-10-18 05:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_search_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportFileChecksum',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('table', models.CharField(max_length=50, unique=True, verbose_name='Таблица')),
+                ('digest', models.CharField(max_length=64, verbose_name='Контрольная сумма')),
+                ('imported_at', models.DateTimeField(auto_now=True, verbose_name='Дата загрузки')),
+            ],
+            options={
+                'verbose_name': 'Контрольная сумма файла импорта',
+                'verbose_name_plural': 'Контрольные суммы файлов импорта',
+            },
+        ),
+        migrations.CreateModel(
+            name='ImportRowChecksum',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('table', models.CharField(max_length=50, verbose_name='Таблица')),
+                ('row_id', models.BigIntegerField(verbose_name='Идентификатор строки')),
+                ('digest', models.CharField(max_length=32, verbose_name='Контрольная сумма')),
+            ],
+            options={
+                'verbose_name': 'Контрольная сумма строки импорта',
+                'verbose_name_plural': 'Контрольные суммы строк импорта',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='importrowchecksum',
+            constraint=models.UniqueConstraint(fields=('table', 'row_id'), name='unique_import_table_row'),
+        ),
+    ]
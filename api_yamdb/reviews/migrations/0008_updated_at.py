@@ -0,0 +1,51 @@
+# Generated by Django 3.2 on 2026-10-18 06:02
+
+from importlib import import_module
+
+from django.db import migrations, models
+
+title_search = import_module('reviews.migrations.0005_title_search')
+
+# SQLite добавляет столбец с NOT NULL пересозданием таблицы
+# reviews_title, и триггеры индекса FTS5 пропадают вместе со старой
+# таблицей. Сам индекс не меняется: идентификаторы строк сохраняются.
+TRIGGERS_SQL = (
+    *title_search.DROP_FTS_SQL[:3],
+    *title_search.FTS_SQL[1:4],
+)
+restore_triggers = title_search.run_on_sqlite(TRIGGERS_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_import_checksums'),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, restore_triggers),
+        migrations.AddField(
+            model_name='comment',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Дата изменения'),
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Дата изменения'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, verbose_name='Дата изменения'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['review', 'updated_at'], name='comment_review_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['title', 'updated_at'], name='review_title_updated_idx'),
+        ),
+        migrations.RunPython(restore_triggers, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 3.2 on 2026-10-18 06:17
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_comments_count(apps, schema_editor):
+    Review = apps.get_model('reviews', 'Review')
+    reviews = Review.objects.annotate(
+        actual_comments_count=Count('comments'),
+    ).filter(actual_comments_count__gt=0)
+    for review in reviews.iterator():
+        review.comments_count = review.actual_comments_count
+        review.save(update_fields=('comments_count',))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='review',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество комментариев'),
+        ),
+        migrations.RunPython(fill_comments_count, migrations.RunPython.noop),
+    ]
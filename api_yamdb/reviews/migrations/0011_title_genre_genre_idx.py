@@ -0,0 +1,22 @@
+from django.db import migrations
+
+# Промежуточная таблица ManyToManyField создаётся автоматически, и
+# индексы в Meta для неё не задать. Индекс (genre_id, title_id)
+# покрывает подзапрос «произведения с жанром» в фильтре `genre`:
+# id произведений читаются из индекса без обращения к таблице.
+CREATE_INDEX_SQL = (
+    'CREATE INDEX title_genre_genre_title_idx '
+    'ON reviews_title_genre (genre_id, title_id)'
+)
+DROP_INDEX_SQL = 'DROP INDEX title_genre_genre_title_idx'
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0010_title_ordering_indexes'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_INDEX_SQL, DROP_INDEX_SQL),
+    ]
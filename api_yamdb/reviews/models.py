@@ -1,16 +1,29 @@
-from django.db import models
+from django.db import connection, models
+from django.db.models import (Case, Count, F, OuterRef, Q, Subquery, Sum,
+                              When)
+from django.db.models.functions import Coalesce
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.utils import timezone
+from reviews.search import (FullTextField, SearchKeyMixin,
+                            build_match_query, normalize_search_text)
 from reviews.validators import validate_year
 from users.models import User
 from api_yamdb.settings import (MAX_LENGTH_FOR_CHAR_FIELD,
                                 MAX_LENGTH_FOR_SLUG_FIELD)
 
 
-class Category(models.Model):
+class Category(SearchKeyMixin, models.Model):
     name = models.CharField(
         verbose_name='Название категории',
         max_length=MAX_LENGTH_FOR_CHAR_FIELD
     )
+    search_name = models.CharField(
+        verbose_name='Ключ поиска',
+        max_length=MAX_LENGTH_FOR_CHAR_FIELD,
+        db_index=True,
+        editable=False,
+        blank=True,
+    )
     slug = models.SlugField(
         verbose_name='Слаг',
         max_length=MAX_LENGTH_FOR_SLUG_FIELD,
@@ -25,11 +38,18 @@ class Category(models.Model):
         return self.name
 
 
-class Genre(models.Model):
+class Genre(SearchKeyMixin, models.Model):
     name = models.CharField(
         verbose_name='Название жанра',
         max_length=MAX_LENGTH_FOR_CHAR_FIELD
     )
+    search_name = models.CharField(
+        verbose_name='Ключ поиска',
+        max_length=MAX_LENGTH_FOR_CHAR_FIELD,
+        db_index=True,
+        editable=False,
+        blank=True,
+    )
     slug = models.SlugField(
         verbose_name='Слаг',
         max_length=MAX_LENGTH_FOR_SLUG_FIELD,
@@ -44,6 +64,66 @@ class Genre(models.Model):
         return self.name
 
 
+class TitleQuerySet(models.QuerySet):
+
+    def apply_review_delta(self, score_delta, count_delta):
+        """Сдвинуть сумму оценок и число отзывов одним UPDATE.
+
+        Правые части выражений ссылаются на значения до обновления,
+        поэтому рейтинг пересчитывается в том же запросе. Изменения могут
+        быть выражениями, например CASE по pk для нескольких произведений.
+        """
+        return self.update(
+            score_sum=F('score_sum') + score_delta,
+            reviews_count=F('reviews_count') + count_delta,
+            rating=Case(
+                When(
+                    reviews_count__gt=-count_delta,
+                    then=(
+                        (F('score_sum') + score_delta)
+                        / (F('reviews_count') + count_delta)
+                    ),
+                ),
+                default=None,
+                output_field=models.PositiveSmallIntegerField(),
+            ),
+            updated_at=timezone.now(),
+        )
+
+    def touch(self):
+        """Отметить произведения изменёнными, например при смене жанра."""
+        return self.update(updated_at=timezone.now())
+
+    def search(self, value):
+        """Полнотекстовый поиск по названию и описанию.
+
+        На SQLite использует индекс FTS5 и сортирует по релевантности,
+        при равной релевантности — по id, чтобы страницы не пересекались.
+
+        На остальных СУБД поиск приблизительный: icontains по каждому
+        слову. Нормализуется только запрос, сохранённый текст сравнивается
+        как есть, поэтому `е` в запросе не находит `ё` в названии.
+        """
+        match = build_match_query(value)
+        if not match:
+            return self.none()
+        if connection.vendor == 'sqlite':
+            return self.filter(
+                search__document__match=match).order_by('search__rank', 'id')
+        condition = Q()
+        for word in normalize_search_text(value).split():
+            condition &= (
+                Q(name__icontains=word) | Q(description__icontains=word))
+        return self.filter(condition).order_by('id')
+
+    def with_actual_rating(self):
+        """Аннотировать фактические сумму оценок и число отзывов."""
+        return self.annotate(
+            actual_score_sum=Coalesce(Sum('reviews__score'), 0),
+            actual_reviews_count=Count('reviews'),
+        )
+
+
 class Title(models.Model):
     name = models.CharField(
         verbose_name='Название произведения',
@@ -72,14 +152,106 @@ class Title(models.Model):
         blank=True,
         null=True
     )
+    score_sum = models.PositiveIntegerField(
+        verbose_name='Сумма оценок',
+        default=0,
+        editable=False,
+    )
+    reviews_count = models.PositiveIntegerField(
+        verbose_name='Количество отзывов',
+        default=0,
+        editable=False,
+    )
+    rating = models.PositiveSmallIntegerField(
+        verbose_name='Рейтинг',
+        blank=True,
+        null=True,
+        editable=False,
+    )
+    updated_at = models.DateTimeField(
+        'Дата изменения', auto_now=True, db_index=True)
+
+    objects = TitleQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
+        # Индексы под сортировки `?ordering=` с добавочной сортировкой
+        # по id, в том числе вместе с фильтром по категории. Для year
+        # хватает индекса поля: в SQLite он уже упорядочен по rowid.
+        indexes = [
+            models.Index(
+                fields=('rating', 'id'),
+                name='title_rating_idx'
+            ),
+            models.Index(
+                fields=('name', 'id'),
+                name='title_name_idx'
+            ),
+            models.Index(
+                fields=('category', 'year', 'id'),
+                name='title_category_year_idx'
+            ),
+            models.Index(
+                fields=('category', 'rating', 'id'),
+                name='title_category_rating_idx'
+            )]
 
     def __str__(self):
         return self.name
 
+    @staticmethod
+    def calculate_rating(score_sum, reviews_count):
+        if not reviews_count:
+            return None
+        return score_sum // reviews_count
+
+
+class TitleSearch(models.Model):
+    """Строка FTS5-индекса произведения.
+
+    Таблица создаётся миграцией и заполняется триггерами на
+    reviews_title, поэтому Django её не изменяет.
+    """
+    title = models.OneToOneField(
+        Title,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_column='rowid',
+        related_name='search',
+    )
+    document = FullTextField(db_column='reviews_title_fts')
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = 'reviews_title_fts'
+
+
+class ReviewQuerySet(models.QuerySet):
+
+    def apply_comment_delta(self, count_delta):
+        """Сдвинуть число комментариев одним UPDATE."""
+        return self.update(
+            comments_count=F('comments_count') + count_delta,
+            updated_at=timezone.now(),
+        )
+
+    def refresh_comments_count(self):
+        """Пересчитать число комментариев одним UPDATE с подзапросом."""
+        counts = Comment.objects.filter(
+            review=OuterRef('pk')
+        ).order_by().values('review').annotate(
+            count=Count('pk')).values('count')
+        return self.update(
+            comments_count=Coalesce(Subquery(counts), 0),
+            updated_at=timezone.now(),
+        )
+
+    def with_actual_comments_count(self):
+        """Аннотировать фактическое число комментариев."""
+        return self.annotate(actual_comments_count=Count('comments'))
+
 
 class Review(models.Model):
     author = models.ForeignKey(
@@ -102,6 +274,14 @@ class Review(models.Model):
     )
     pub_date = models.DateTimeField(
         'Дата добавления', auto_now_add=True, db_index=True)
+    updated_at = models.DateTimeField('Дата изменения', auto_now=True)
+    comments_count = models.PositiveIntegerField(
+        verbose_name='Количество комментариев',
+        default=0,
+        editable=False,
+    )
+
+    objects = ReviewQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'Отзыв'
@@ -111,6 +291,15 @@ class Review(models.Model):
                 fields=('title', 'author', ),
                 name='unique_title_author'
             )]
+        indexes = [
+            models.Index(
+                fields=('title', 'pub_date', 'id'),
+                name='review_title_pub_date_idx'
+            ),
+            models.Index(
+                fields=('title', 'updated_at'),
+                name='review_title_updated_idx'
+            )]
         ordering = ('pub_date',)
 
     def __str__(self):
@@ -135,11 +324,70 @@ class Comment(models.Model):
     )
     pub_date = models.DateTimeField(
         'Дата публикации', auto_now_add=True, db_index=True)
+    updated_at = models.DateTimeField('Дата изменения', auto_now=True)
 
     class Meta:
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = [
+            models.Index(
+                fields=('review', 'pub_date', 'id'),
+                name='comment_review_pub_date_idx'
+            ),
+            models.Index(
+                fields=('review', 'updated_at'),
+                name='comment_review_updated_idx'
+            )]
         ordering = ('pub_date',)
 
     def __str__(self):
         return self.text
+
+
+class ImportRowChecksum(models.Model):
+    """Контрольная сумма строки CSV, загруженной командой import_db."""
+    table = models.CharField(
+        verbose_name='Таблица',
+        max_length=MAX_LENGTH_FOR_SLUG_FIELD
+    )
+    row_id = models.BigIntegerField(
+        verbose_name='Идентификатор строки'
+    )
+    digest = models.CharField(
+        verbose_name='Контрольная сумма',
+        max_length=32
+    )
+
+    class Meta:
+        verbose_name = 'Контрольная сумма строки импорта'
+        verbose_name_plural = 'Контрольные суммы строк импорта'
+        constraints = [
+            models.UniqueConstraint(
+                fields=('table', 'row_id', ),
+                name='unique_import_table_row'
+            )]
+
+    def __str__(self):
+        return f'{self.table}:{self.row_id}'
+
+
+class ImportFileChecksum(models.Model):
+    """Контрольная сумма CSV-файла целиком на момент последней загрузки."""
+    table = models.CharField(
+        verbose_name='Таблица',
+        max_length=MAX_LENGTH_FOR_SLUG_FIELD,
+        unique=True
+    )
+    digest = models.CharField(
+        verbose_name='Контрольная сумма',
+        max_length=64
+    )
+    imported_at = models.DateTimeField(
+        'Дата загрузки', auto_now=True)
+
+    class Meta:
+        verbose_name = 'Контрольная сумма файла импорта'
+        verbose_name_plural = 'Контрольные суммы файлов импорта'
+
+    def __str__(self):
+        return self.table
@@ -0,0 +1,53 @@
+import re
+import unicodedata
+
+from django.db import models
+
+WORD_PATTERN = re.compile(r'\w+')
+
+
+def normalize_search_text(value):
+    """Привести текст к виду для поиска: NFKC, casefold, ё → е."""
+    value = unicodedata.normalize('NFKC', value or '')
+    return value.casefold().replace('ё', 'е')
+
+
+def build_match_query(value):
+    """Собрать запрос FTS5: все слова обязательны, каждое — как префикс."""
+    words = WORD_PATTERN.findall(normalize_search_text(value))
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+class FullTextField(models.TextField):
+    """Скрытый столбец FTS5-таблицы, по которому выполняется MATCH."""
+
+
+@FullTextField.register_lookup
+class FullTextMatch(models.Lookup):
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', lhs_params + rhs_params
+
+
+class SearchKeyMixin:
+    """Хранить нормализованный ключ поиска рядом с исходным полем."""
+    search_source_field = 'name'
+    search_key_field = 'search_name'
+
+    def fill_search_key(self):
+        key_field = self._meta.get_field(self.search_key_field)
+        value = normalize_search_text(
+            getattr(self, self.search_source_field))
+        setattr(self, self.search_key_field, value[:key_field.max_length])
+
+    def save(self, *args, **kwargs):
+        self.fill_search_key()
+        update_fields = kwargs.get('update_fields')
+        if (update_fields is not None
+                and self.search_source_field in update_fields):
+            kwargs['update_fields'] = {
+                *update_fields, self.search_key_field}
+        super().save(*args, **kwargs)
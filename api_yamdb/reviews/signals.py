@@ -0,0 +1,132 @@
+from django.db.models.signals import (m2m_changed, post_delete, post_init,
+                                      post_save, pre_delete)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from reviews.models import Category, Comment, Genre, Review, Title
+from users.models import User
+
+
+def _rating_state(instance):
+    # Через __dict__, чтобы не подгружать отложенные поля.
+    score = instance.__dict__.get('score')
+    return (
+        instance.__dict__.get('title_id'),
+        int(score) if score is not None else None,
+    )
+
+
+@receiver(post_init, sender=Review)
+def remember_review_rating_state(sender, instance, **kwargs):
+    """Запомнить произведение и оценку, с которыми отзыв был загружен."""
+    instance._rating_state = _rating_state(instance)
+
+
+@receiver(post_save, sender=Review)
+def update_title_rating_on_save(sender, instance, created, raw, **kwargs):
+    """Учесть новый или изменённый отзыв в рейтинге произведения."""
+    if raw:
+        return
+    old_title_id, old_score = instance._rating_state
+    title_id, score = _rating_state(instance)
+    if created:
+        Title.objects.filter(pk=title_id).apply_review_delta(score, 1)
+    elif old_title_id != title_id:
+        Title.objects.filter(pk=old_title_id).apply_review_delta(
+            -old_score, -1)
+        Title.objects.filter(pk=title_id).apply_review_delta(score, 1)
+    elif old_score != score:
+        Title.objects.filter(pk=title_id).apply_review_delta(
+            score - old_score, 0)
+    instance._rating_state = (title_id, score)
+
+
+@receiver(post_delete, sender=Review)
+def update_title_rating_on_delete(sender, instance, **kwargs):
+    """Исключить удалённый отзыв из рейтинга, в том числе при каскаде."""
+    title_id, score = instance._rating_state
+    Title.objects.filter(pk=title_id).apply_review_delta(-score, -1)
+
+
+def _comment_review_id(instance):
+    return instance.__dict__.get('review_id')
+
+
+@receiver(post_init, sender=Comment)
+def remember_comment_review(sender, instance, **kwargs):
+    """Запомнить отзыв, к которому комментарий был загружен."""
+    instance._counted_review_id = _comment_review_id(instance)
+
+
+@receiver(post_save, sender=Comment)
+def update_comments_count_on_save(sender, instance, created, raw, **kwargs):
+    """Учесть новый или перенесённый комментарий в счётчике отзыва."""
+    if raw:
+        return
+    old_review_id = instance._counted_review_id
+    review_id = _comment_review_id(instance)
+    if created:
+        Review.objects.filter(pk=review_id).apply_comment_delta(1)
+    elif old_review_id != review_id:
+        Review.objects.filter(pk=old_review_id).apply_comment_delta(-1)
+        Review.objects.filter(pk=review_id).apply_comment_delta(1)
+    instance._counted_review_id = review_id
+
+
+@receiver(post_delete, sender=Comment)
+def update_comments_count_on_delete(sender, instance, **kwargs):
+    """Исключить удалённый комментарий из счётчика, в том числе при каскаде."""
+    Review.objects.filter(
+        pk=instance._counted_review_id).apply_comment_delta(-1)
+
+
+# Ниже — поддержка updated_at у объектов, в представление которых
+# входят данные других моделей: жанры и категория произведения,
+# имя автора отзыва и комментария.
+
+@receiver(post_save, sender=Genre)
+@receiver(pre_delete, sender=Genre)
+def touch_titles_of_genre(sender, instance, raw=False, created=False,
+                          **kwargs):
+    """Отметить изменёнными произведения переименованного жанра."""
+    if not raw and not created:
+        Title.objects.filter(genre=instance).touch()
+
+
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+def touch_titles_of_category(sender, instance, raw=False, created=False,
+                             **kwargs):
+    """Отметить изменёнными произведения изменённой категории."""
+    if not raw and not created:
+        Title.objects.filter(category=instance).touch()
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def touch_titles_on_genres_change(sender, instance, action, reverse,
+                                  pk_set, **kwargs):
+    """Отметить изменёнными произведения, у которых сменились жанры."""
+    if reverse and action == 'pre_clear':
+        # После genre.titles.clear() связей уже нет, а pk_set пуст.
+        Title.objects.filter(genre=instance).touch()
+    elif not reverse and action.startswith('post_'):
+        Title.objects.filter(pk=instance.pk).touch()
+    elif action in ('post_add', 'post_remove'):
+        Title.objects.filter(pk__in=pk_set).touch()
+
+
+@receiver(post_init, sender=User)
+def remember_username(sender, instance, **kwargs):
+    instance._initial_username = instance.__dict__.get('username')
+
+
+@receiver(post_save, sender=User)
+def touch_posts_on_rename(sender, instance, created, raw, **kwargs):
+    """Отметить изменёнными отзывы и комментарии переименованного автора."""
+    if (created or raw
+            or instance._initial_username in (None, instance.username)):
+        return
+    now = timezone.now()
+    Review.objects.filter(author=instance).update(updated_at=now)
+    Comment.objects.filter(author=instance).update(updated_at=now)
+    instance._initial_username = instance.username
@@ -1,8 +1,15 @@
 from django.contrib import admin
 
-from .models import User
+from .models import OutboxEmail, User
 
 
 @admin.register(User)
 class UserAdmin(admin.ModelAdmin):
     pass
+
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'recipients', 'created_at', 'attempts',
+                    'sent_at')
+    list_filter = ('sent_at',)
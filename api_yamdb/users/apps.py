@@ -4,3 +4,15 @@ from django.apps import AppConfig
 class UsersConfig(AppConfig):
     verbose_name = 'Пользователи'
     name = 'users'
+
+    def ready(self):
+        from api.metrics import registry
+        from users import signals  # noqa: F401
+        from users.outbox import queue_depth
+
+        registry.add_gauge(
+            'yamdb_email_outbox_pending', 'Писем в очереди на отправку.',
+            lambda: queue_depth()['pending'])
+        registry.add_gauge(
+            'yamdb_email_outbox_failed', 'Писем, исчерпавших попытки.',
+            lambda: queue_depth()['failed'])
@@ -0,0 +1,62 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+
+# Поля, которых достаточно для проверок прав; остальные поля
+# пользователя отложены и подгружаются из базы только при обращении.
+IDENTITY_FIELDS = ('id', 'username', 'role', 'is_superuser', 'is_active')
+
+
+def identity_fields(model):
+    # from_db ожидает значения в порядке полей модели.
+    return tuple(
+        field.attname for field in model._meta.concrete_fields
+        if field.attname in IDENTITY_FIELDS
+    )
+
+
+def identity_cache_key(user_id):
+    return f'jwt-user:{user_id}'
+
+
+def forget_identity(user_id):
+    cache.delete(identity_cache_key(user_id))
+
+
+def forget_identities(user_ids):
+    cache.delete_many([identity_cache_key(user_id) for user_id in user_ids])
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWT-аутентификация, которая берёт пользователя из кеша.
+
+    В кеше на JWT_USER_CACHE_TIMEOUT секунд хранятся только поля
+    IDENTITY_FIELDS. При сохранении или удалении пользователя запись
+    сбрасывается сигналом, таймаут ограничивает устаревание в кешах
+    других процессов.
+    """
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return super().get_user(validated_token)
+        fields = identity_fields(self.user_model)
+        key = identity_cache_key(user_id)
+        values = cache.get(key)
+        if values is None:
+            values = self.user_model.objects.filter(
+                **{api_settings.USER_ID_FIELD: user_id}
+            ).values_list(*fields).first()
+            if values is None:
+                raise AuthenticationFailed(
+                    _('User not found'), code='user_not_found')
+            cache.set(key, values, settings.JWT_USER_CACHE_TIMEOUT)
+        user = self.user_model.from_db(
+            self.user_model.objects.db, fields, values)
+        if not user.is_active:
+            raise AuthenticationFailed(
+                _('User is inactive'), code='user_inactive')
+        return user
@@ -0,0 +1,54 @@
+import time
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.management import BaseCommand
+from django.db import OperationalError
+
+from users.outbox import queue_depth, send_batch
+
+BATCH_SIZE = 100
+INTERVAL = 5
+
+
+class Command(BaseCommand):
+    help = 'Отправлять письма из очереди (OutboxEmail).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', default=BATCH_SIZE, type=int,
+            help='Число писем, отправляемых через одно соединение.')
+        parser.add_argument(
+            '--interval', default=INTERVAL, type=float,
+            help='Пауза в секундах, когда очередь пуста.')
+        parser.add_argument(
+            '--max-attempts', default=settings.EMAIL_OUTBOX_MAX_ATTEMPTS,
+            type=int, help='Число попыток отправить письмо.')
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Разобрать очередь и завершиться.')
+
+    def handle(self, *args, **options):
+        connection = get_connection()
+        while True:
+            try:
+                sent, failed = send_batch(
+                    options['batch_size'], options['max_attempts'],
+                    connection)
+            except OperationalError as error:
+                # Например, база занята: письма пачки вернутся в очередь
+                # по истечении EMAIL_OUTBOX_LEASE.
+                if options['once']:
+                    raise
+                self.stderr.write(f'Ошибка базы данных: {error}')
+                time.sleep(options['interval'])
+                continue
+            if sent or failed:
+                depth = queue_depth(options['max_attempts'])
+                self.stdout.write(
+                    f'Отправлено {sent}, ошибок {failed}; в очереди '
+                    f'{depth["pending"]}, не отправлено {depth["failed"]}.')
+                continue
+            if options['once']:
+                return
+            time.sleep(options['interval'])
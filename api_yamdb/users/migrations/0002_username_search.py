@@ -0,0 +1,29 @@
+# Generated by Django 3.2 on 2026-10-18 05:34
+
+from django.db import migrations, models
+
+from reviews.search import normalize_search_text
+
+
+def fill_username_search(apps, schema_editor):
+    User = apps.get_model('users', 'User')
+    users = User.objects.only('id', 'username')
+    for user in users.iterator():
+        user.username_search = normalize_search_text(user.username)
+        user.save(update_fields=('username_search',))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='username_search',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=150, verbose_name='Ключ поиска по имени'),
+        ),
+        migrations.RunPython(fill_username_search, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 3.2 on 2026-10-18 05:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_outbox_email'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ThrottleBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=255, unique=True, verbose_name='Ключ')),
+                ('capacity', models.PositiveIntegerField(verbose_name='Ёмкость')),
+                ('rate', models.FloatField(verbose_name='Токенов в секунду')),
+                ('tokens', models.FloatField(verbose_name='Токенов')),
+                ('updated_at', models.FloatField(verbose_name='Время обновления, unix')),
+                ('allowed', models.BooleanField(verbose_name='Последний запрос пропущен')),
+            ],
+            options={
+                'verbose_name': 'Корзина ограничителя',
+                'verbose_name_plural': 'Корзины ограничителя',
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2 on 2026-10-18 06:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_throttle_bucket'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outboxemail',
+            name='claim_token',
+            field=models.CharField(blank=True, db_index=True, max_length=32, verbose_name='Метка воркера'),
+        ),
+    ]
@@ -1,12 +1,14 @@
 from django.contrib.auth.models import AbstractUser
 from django.contrib.auth.validators import UnicodeUsernameValidator
 from django.db import models
+from django.utils import timezone
 from api_yamdb.settings import MAX_LENGTH_FIELD_150
+from reviews.search import SearchKeyMixin
 
 from .validators import validate_username_not_me
 
 
-class User(AbstractUser):
+class User(SearchKeyMixin, AbstractUser):
     MODERATOR = 'moderator'
     USER = 'user'
     ADMIN = 'admin'
@@ -40,6 +42,16 @@ class User(AbstractUser):
         'Биография',
         blank=True
     )
+    username_search = models.CharField(
+        'Ключ поиска по имени',
+        max_length=MAX_LENGTH_FIELD_150,
+        db_index=True,
+        editable=False,
+        blank=True,
+    )
+
+    search_source_field = 'username'
+    search_key_field = 'username_search'
 
     @property
     def is_admin_role(self):
@@ -48,3 +60,53 @@ class User(AbstractUser):
     @property
     def is_moderator_role(self):
         return self.role == self.MODERATOR or self.is_superuser
+
+
+class OutboxEmail(models.Model):
+    """Письмо, ожидающее отправки воркером send_emails."""
+    subject = models.CharField('Тема', max_length=MAX_LENGTH_FIELD_150)
+    message = models.TextField('Текст')
+    from_email = models.EmailField('Отправитель')
+    recipients = models.TextField('Получатели через запятую')
+    created_at = models.DateTimeField('Дата создания', auto_now_add=True)
+    next_attempt_at = models.DateTimeField(
+        'Следующая попытка', default=timezone.now)
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    sent_at = models.DateTimeField('Дата отправки', null=True, blank=True)
+    claim_token = models.CharField(
+        'Метка воркера', max_length=32, blank=True, db_index=True)
+
+    class Meta:
+        verbose_name = 'Письмо в очереди'
+        verbose_name_plural = 'Очередь писем'
+        indexes = [
+            models.Index(
+                fields=('next_attempt_at', 'id'),
+                condition=models.Q(sent_at__isnull=True),
+                name='outbox_pending_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.subject} → {self.recipients}'
+
+
+class ThrottleBucket(models.Model):
+    """Корзина токенов ограничителя частоты запросов.
+
+    Хранится в базе, чтобы лимит был общим для всех процессов.
+    """
+    key = models.CharField('Ключ', max_length=255, unique=True)
+    capacity = models.PositiveIntegerField('Ёмкость')
+    rate = models.FloatField('Токенов в секунду')
+    tokens = models.FloatField('Токенов')
+    updated_at = models.FloatField('Время обновления, unix')
+    allowed = models.BooleanField('Последний запрос пропущен')
+
+    class Meta:
+        verbose_name = 'Корзина ограничителя'
+        verbose_name_plural = 'Корзины ограничителя'
+
+    def __str__(self):
+        return self.key
@@ -0,0 +1,122 @@
+"""Очередь исходящих писем.
+
+Письма сохраняются в таблицу в той же транзакции, что и изменения,
+ради которых они отправляются, а отправляет их отдельный процесс
+(`python manage.py send_emails`), поэтому задержка почтового сервера
+не попадает во время ответа API.
+"""
+import datetime as dt
+import uuid
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import F
+from django.utils import timezone
+
+from users.models import OutboxEmail
+
+
+def enqueue_email(subject, message, from_email, recipient_list):
+    return OutboxEmail.objects.create(
+        subject=subject, message=message, from_email=from_email,
+        recipients=','.join(recipient_list))
+
+
+def backoff(attempts):
+    """Пауза перед следующей попыткой: растёт вдвое, но не больше потолка."""
+    return dt.timedelta(seconds=min(
+        settings.EMAIL_OUTBOX_BACKOFF * 2 ** (attempts - 1),
+        settings.EMAIL_OUTBOX_MAX_BACKOFF,
+    ))
+
+
+def pending(max_attempts=None):
+    max_attempts = max_attempts or settings.EMAIL_OUTBOX_MAX_ATTEMPTS
+    return OutboxEmail.objects.filter(
+        sent_at__isnull=True, attempts__lt=max_attempts)
+
+
+def queue_depth(max_attempts=None):
+    """Число писем в очереди и писем, исчерпавших попытки."""
+    max_attempts = max_attempts or settings.EMAIL_OUTBOX_MAX_ATTEMPTS
+    return {
+        'pending': pending(max_attempts).count(),
+        'failed': OutboxEmail.objects.filter(
+            sent_at__isnull=True, attempts__gte=max_attempts).count(),
+    }
+
+
+def claim_batch(batch_size, max_attempts, now):
+    """Забрать пачку писем одним UPDATE и вернуть её.
+
+    Забранные письма получают метку воркера и откладываются на
+    EMAIL_OUTBOX_LEASE секунд, поэтому другие воркеры их не видят.
+    Условие на next_attempt_at повторяется во внешнем запросе: если
+    письмо уже забрал другой воркер, оно не подходит и здесь.
+    """
+    due = pending(max_attempts).filter(next_attempt_at__lte=now)
+    token = uuid.uuid4().hex
+    due.filter(pk__in=due.order_by('next_attempt_at', 'id').values(
+        'pk')[:batch_size]).update(
+        claim_token=token,
+        next_attempt_at=now + dt.timedelta(
+            seconds=settings.EMAIL_OUTBOX_LEASE),
+    )
+    return list(OutboxEmail.objects.filter(
+        claim_token=token).order_by('next_attempt_at', 'id'))
+
+
+def record_sent(email):
+    OutboxEmail.objects.filter(
+        pk=email.pk, claim_token=email.claim_token
+    ).update(sent_at=timezone.now(), claim_token='')
+
+
+def record_failed(email, error, now):
+    OutboxEmail.objects.filter(
+        pk=email.pk, claim_token=email.claim_token
+    ).update(
+        attempts=F('attempts') + 1,
+        last_error=f'{type(error).__name__}: {error}',
+        next_attempt_at=now + backoff(email.attempts + 1),
+        claim_token='',
+    )
+
+
+def send_batch(batch_size=100, max_attempts=None, connection=None):
+    """Отправить очередную пачку писем, вернуть (отправлено, ошибок).
+
+    Все письма пачки уходят через одно соединение с почтовым сервером.
+    Пачка забирается коротким запросом на запись, письма отправляются
+    без открытой транзакции, а результат каждого письма записывается
+    отдельным UPDATE: медленный почтовый сервер не держит блокировку
+    базы, и уже отправленное письмо не откатится вместе с пачкой.
+    """
+    now = timezone.now()
+    sent = failed = 0
+    emails = claim_batch(batch_size, max_attempts, now)
+    if not emails:
+        return sent, failed
+    connection = connection or get_connection()
+    try:
+        connection.open()
+    except Exception as error:
+        for email in emails:
+            record_failed(email, error, now)
+        return sent, len(emails)
+    try:
+        for email in emails:
+            try:
+                connection.send_messages([EmailMessage(
+                    email.subject, email.message, email.from_email,
+                    email.recipients.split(','),
+                )])
+            except Exception as error:
+                record_failed(email, error, now)
+                failed += 1
+            else:
+                record_sent(email)
+                sent += 1
+    finally:
+        connection.close()
+    return sent, failed
@@ -0,0 +1,19 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from users.authentication import forget_identity
+from users.models import User
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_cached_identity(sender, instance, **kwargs):
+    """Сбросить закешированные для JWT роль и статус пользователя.
+
+    Сброс — после фиксации транзакции: иначе параллельный запрос
+    успел бы снова закешировать старую строку.
+    """
+    transaction.on_commit(partial(forget_identity, instance.pk))
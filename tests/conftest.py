@@ -1,6 +1,8 @@
 import os
 import sys
 
+import pytest
+
 from django.utils.version import get_version
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -30,6 +32,20 @@ if FILENAME not in project_dir_content:
 
 assert get_version() < '4.0.0', 'Пожалуйста, используйте версию Django < 4.0.0'
 
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from django.conf import settings
+    from django.core.cache import caches
+
+    for alias in settings.CACHES:
+        caches[alias].clear()
+    yield
+    for alias in settings.CACHES:
+        caches[alias].clear()
+
+
 pytest_plugins = [
     'tests.fixtures.fixture_user',
+    'tests.fixtures.fixture_review',
 ]
@@ -0,0 +1,22 @@
+import pytest
+
+
+@pytest.fixture
+def review(moderator):
+    from reviews.models import Category, Genre, Review, Title
+
+    category = Category.objects.create(name='Фильм', slug='film')
+    title = Title.objects.create(name='Фильм', year=2000,
+                                 description='Длинное описание',
+                                 category=category)
+    title.genre.add(Genre.objects.create(name='Драма', slug='drama'))
+    return Review.objects.create(
+        title=title, author=moderator, text='Отзыв', score=5)
+
+
+@pytest.fixture
+def comment(user, review):
+    from reviews.models import Comment
+
+    return Comment.objects.create(
+        review=review, author=user, text='Комментарий')
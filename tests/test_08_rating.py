@@ -0,0 +1,91 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08RatingAggregate:
+
+    def _get_title(self, title_id):
+        from reviews.models import Title
+        return Title.objects.get(pk=title_id)
+
+    def test_01_rating_follows_review_changes(self, admin_client, user_client,
+                                              moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        url = f'/api/v1/titles/{title_id}/reviews/'
+
+        create_single_review(admin_client, title_id, 'Отлично', 10)
+        review = create_single_review(user_client, title_id, 'Так себе', 5)
+        create_single_review(moderator_client, title_id, 'Неплохо', 7)
+        title = self._get_title(title_id)
+        assert (title.score_sum, title.reviews_count, title.rating) == (
+            22, 3, 7
+        ), (
+            'Проверьте, что при создании отзыва обновляются сумма оценок, '
+            'число отзывов и рейтинг произведения.'
+        )
+
+        response = user_client.patch(
+            f'{url}{review.json()["id"]}/', data={'score': 1}
+        )
+        assert response.status_code == HTTPStatus.OK
+        title = self._get_title(title_id)
+        assert (title.score_sum, title.reviews_count, title.rating) == (
+            18, 3, 6
+        ), (
+            'Проверьте, что при изменении оценки рейтинг произведения '
+            'пересчитывается.'
+        )
+
+        response = user_client.delete(f'{url}{review.json()["id"]}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        title = self._get_title(title_id)
+        assert (title.score_sum, title.reviews_count, title.rating) == (
+            17, 2, 8
+        ), (
+            'Проверьте, что при удалении отзыва рейтинг произведения '
+            'пересчитывается.'
+        )
+
+        response = admin_client.get(f'/api/v1/titles/{title_id}/')
+        assert response.json()['rating'] == 8
+
+    def test_02_rating_follows_cascade_delete(self, admin_client, user_client,
+                                              user):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(admin_client, title_id, 'Отлично', 10)
+        create_single_review(user_client, title_id, 'Плохо', 2)
+
+        user.delete()
+        title = self._get_title(title_id)
+        assert (title.score_sum, title.reviews_count, title.rating) == (
+            10, 1, 10
+        ), (
+            'Проверьте, что при удалении пользователя его отзывы исключаются '
+            'из рейтинга произведения.'
+        )
+
+    def test_03_recount_ratings_command(self, admin_client):
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(admin_client, title_id, 'Отлично', 9)
+        Title.objects.filter(pk=title_id).update(
+            score_sum=0, reviews_count=0, rating=None
+        )
+
+        call_command('recount_ratings')
+        title = self._get_title(title_id)
+        assert (title.score_sum, title.reviews_count, title.rating) == (
+            9, 1, 9
+        ), (
+            'Проверьте, что команда `recount_ratings` исправляет '
+            'расхождения в рейтинге.'
+        )
@@ -0,0 +1,100 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+# Максимальное число SQL-запросов на одну страницу списка.
+# Не должно зависеть от размера страницы.
+QUERY_BUDGET = {
+    'titles': 3,
+    # Версия списка для условного GET и страница с авторами.
+    'reviews': 2,
+    'comments': 2,
+    # Пользователь из JWT берётся из кеша.
+    'users': 2,
+}
+PAGE_SIZES = (5, 50)
+OBJECTS_COUNT = 60
+
+
+@pytest.fixture
+def catalog(admin, django_user_model):
+    from reviews.models import Category, Comment, Genre, Review, Title
+
+    category = Category.objects.create(name='Фильм', slug='films')
+    # SQLite не возвращает первичные ключи из bulk_create,
+    # поэтому созданные объекты перечитываются из базы.
+    Genre.objects.bulk_create(
+        Genre(name=f'Жанр {idx}', slug=f'genre-{idx}') for idx in range(3)
+    )
+    genres = list(Genre.objects.all())
+    Title.objects.bulk_create(
+        Title(name=f'Произведение {idx}', year=2000, category=category)
+        for idx in range(OBJECTS_COUNT)
+    )
+    titles = list(Title.objects.order_by('id'))
+    Title.genre.through.objects.bulk_create(
+        Title.genre.through(title=title, genre=genre)
+        for title in titles for genre in genres
+    )
+    django_user_model.objects.bulk_create(
+        django_user_model(username=f'author{idx}',
+                          email=f'author{idx}@yamdb.fake')
+        for idx in range(OBJECTS_COUNT)
+    )
+    authors = list(
+        django_user_model.objects.filter(username__startswith='author')
+    )
+    Review.objects.bulk_create(
+        Review(title=titles[0], author=author, text='Отзыв', score=5)
+        for author in authors
+    )
+    review = Review.objects.filter(title=titles[0]).first()
+    Comment.objects.bulk_create(
+        Comment(review=review, author=author, text='Комментарий')
+        for author in authors
+    )
+    return titles[0], review
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09QueryBudget:
+
+    def _check_budget(self, client, name, url):
+        # Первый запрос прогревает кеш аутентификации.
+        client.get(url)
+        counts = []
+        for page_size in PAGE_SIZES:
+            with CaptureQueriesContext(connection) as context:
+                response = client.get(url, {'limit': page_size})
+            assert response.status_code == HTTPStatus.OK
+            assert len(response.json()['results']) == page_size
+            counts.append(len(context.captured_queries))
+        assert max(counts) <= QUERY_BUDGET[name], (
+            f'GET-запрос к `{url}` выполняет {max(counts)} SQL-запросов, '
+            f'допустимо не больше {QUERY_BUDGET[name]}.'
+        )
+        assert len(set(counts)) == 1, (
+            f'Число SQL-запросов для `{url}` зависит от размера страницы: '
+            f'{dict(zip(PAGE_SIZES, counts))}.'
+        )
+
+    def test_01_titles(self, client, catalog):
+        self._check_budget(client, 'titles', '/api/v1/titles/')
+
+    def test_02_reviews(self, client, catalog):
+        title, _ = catalog
+        self._check_budget(
+            client, 'reviews', f'/api/v1/titles/{title.id}/reviews/'
+        )
+
+    def test_03_comments(self, client, catalog):
+        title, review = catalog
+        self._check_budget(
+            client, 'comments',
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/'
+        )
+
+    def test_04_users(self, admin_client, catalog):
+        self._check_budget(admin_client, 'users', '/api/v1/users/')
@@ -0,0 +1,53 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_reviews, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10CursorPagination:
+
+    def _walk(self, client, url):
+        collected = []
+        response = client.get(url, {'cursor': '', 'limit': 2})
+        while True:
+            assert response.status_code == HTTPStatus.OK, (
+                f'Проверьте, что GET-запрос с параметром `cursor` к `{url}` '
+                'возвращает ответ со статусом 200.'
+            )
+            data = response.json()
+            assert 'count' not in data, (
+                'Проверьте, что в режиме курсорной пагинации ответ не '
+                'содержит ключ `count`.'
+            )
+            collected.extend(obj['id'] for obj in data['results'])
+            if not data['next']:
+                return collected
+            response = client.get(data['next'])
+
+    def test_01_titles_cursor(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        collected = self._walk(client, '/api/v1/titles/')
+        assert collected == sorted(title['id'] for title in titles)
+
+    def test_02_reviews_cursor(self, client, admin_client, admin, user_client,
+                               user, moderator_client, moderator):
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client
+        }
+        reviews, titles = create_reviews(admin_client, author_map)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        collected = self._walk(client, url)
+        assert collected == [review['id'] for review in reviews], (
+            f'Проверьте, что курсорная пагинация `{url}` возвращает все '
+            'отзывы в порядке публикации без пропусков и повторов.'
+        )
+
+        response = client.get(url, {'limit': 2, 'offset': 2})
+        assert response.json()['count'] == len(reviews), (
+            'Проверьте, что без параметра `cursor` сохраняется пагинация '
+            'limit/offset.'
+        )
@@ -0,0 +1,72 @@
+from http import HTTPStatus
+
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11TitleSearch:
+
+    def _search(self, client, value):
+        response = client.get('/api/v1/titles/', {'search': value})
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что GET-запрос к `/api/v1/titles/` с параметром '
+            '`search` возвращает ответ со статусом 200.'
+        )
+        return [title['name'] for title in response.json()['results']]
+
+    def test_01_search_cyrillic(self, client):
+        from reviews.models import Title
+
+        Title.objects.create(
+            name='Побег из Шоушенка', year=1994,
+            description='Тюремная драма'
+        )
+        Title.objects.create(name='Ёлки', year=2010)
+        Title.objects.create(
+            name='Зелёная миля', year=1999,
+            description='Побег здесь не главное'
+        )
+
+        assert self._search(client, 'ШОУШЕНК') == ['Побег из Шоушенка'], (
+            'Проверьте, что поиск по названию не зависит от регистра '
+            'кириллицы и находит слова по префиксу.'
+        )
+        assert self._search(client, 'елки') == ['Ёлки'], (
+            'Проверьте, что при поиске буквы `ё` и `е` не различаются.'
+        )
+        assert self._search(client, 'побег') == [
+            'Побег из Шоушенка', 'Зелёная миля'
+        ], (
+            'Проверьте, что результаты поиска отсортированы по '
+            'релевантности.'
+        )
+        assert self._search(client, 'побег драма') == ['Побег из Шоушенка']
+
+    def test_02_search_index_follows_writes(self, client):
+        from reviews.models import Title
+
+        title = Title.objects.create(name='Терминатор', year=1984)
+        title.name = 'Чужой'
+        title.save()
+        assert self._search(client, 'терминатор') == []
+        assert self._search(client, 'чужой') == ['Чужой']
+
+        title.delete()
+        assert self._search(client, 'чужой') == []
+
+    def test_03_equal_rank_pages(self, client):
+        from reviews.models import Title
+
+        ids = [
+            Title.objects.create(name='Матрица', year=1999).id
+            for _ in range(4)
+        ]
+        found = []
+        for offset in range(len(ids)):
+            response = client.get('/api/v1/titles/', {
+                'search': 'матрица', 'limit': 1, 'offset': offset})
+            found += [title['id'] for title in response.json()['results']]
+        assert found == ids, (
+            'Проверьте, что результаты с равной релевантностью '
+            'упорядочены по id и страницы не пересекаются.'
+        )
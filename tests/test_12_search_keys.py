@@ -0,0 +1,51 @@
+from http import HTTPStatus
+
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12SearchKeys:
+
+    def _search(self, client, url, value, key):
+        response = client.get(url, {'search': value})
+        assert response.status_code == HTTPStatus.OK
+        return [obj[key] for obj in response.json()['results']]
+
+    def test_01_genre_and_category_search(self, client, admin_client):
+        admin_client.post(
+            '/api/v1/genres/', data={'name': 'Научная фантастика',
+                                     'slug': 'sci-fi'}
+        )
+        admin_client.post(
+            '/api/v1/genres/', data={'name': 'Фэнтези', 'slug': 'fantasy'}
+        )
+        admin_client.post(
+            '/api/v1/categories/', data={'name': 'Чёрно-белое кино',
+                                         'slug': 'bw'}
+        )
+        assert self._search(
+            client, '/api/v1/genres/', 'НАУЧНАЯ  фан', 'slug'
+        ) == ['sci-fi'], (
+            'Проверьте, что поиск жанра по началу названия не зависит от '
+            'регистра кириллицы.'
+        )
+        assert self._search(
+            client, '/api/v1/categories/', 'черно', 'slug'
+        ) == ['bw'], (
+            'Проверьте, что при поиске категории буквы `ё` и `е` не '
+            'различаются.'
+        )
+
+    def test_02_user_search(self, admin_client, django_user_model):
+        django_user_model.objects.create_user(
+            username='Ёжик', email='hedgehog@yamdb.fake'
+        )
+        django_user_model.objects.create_user(
+            username='Медвежонок', email='bear@yamdb.fake'
+        )
+        assert self._search(
+            admin_client, '/api/v1/users/', 'еж', 'username'
+        ) == ['Ёжик'], (
+            'Проверьте, что поиск пользователя по началу имени не зависит '
+            'от регистра и буквы `ё`.'
+        )
@@ -0,0 +1,268 @@
+import pytest
+from django.core.management import call_command
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13ImportDb:
+
+    def test_01_import_db(self):
+        from reviews.models import Comment, Review, Title
+        from users.models import User
+
+        call_command('import_db', batch_size=7)
+
+        assert Title.objects.count() == 32
+        assert Review.objects.count() == 72
+        assert Comment.objects.count() == 3
+        assert User.objects.filter(username_search='bingobongo').exists(), (
+            'Проверьте, что при загрузке заполняются ключи поиска.'
+        )
+        title = Title.objects.get(pk=1)
+        assert (title.reviews_count, title.rating) == (2, 10), (
+            'Проверьте, что при загрузке отзывов пересчитывается рейтинг '
+            'произведений.'
+        )
+        review = Review.objects.get(pk=1)
+        assert review.pub_date.year == 2019, (
+            'Проверьте, что при загрузке сохраняется дата из CSV.'
+        )
+        call_command('recount_ratings', check=True)
+
+    def test_02_import_db_incremental(self, tmp_path):
+        import shutil
+
+        from django.conf import settings
+
+        from reviews.models import Review, Title
+
+        data_dir = tmp_path / 'data'
+        shutil.copytree(settings.BASE_DIR / 'static' / 'data', data_dir)
+        call_command('import_db', data_dir=data_dir)
+        call_command('import_db', data_dir=data_dir, incremental=True)
+        assert Review.objects.count() == 72, (
+            'Проверьте, что повторная загрузка без изменений в режиме '
+            '`--incremental` не создаёт дубликатов.'
+        )
+
+        titles_csv = data_dir / 'titles.csv'
+        titles_csv.write_text(
+            titles_csv.read_text(encoding='utf-8').replace(
+                '1,Побег из Шоушенка,', '1,Побег из Алькатраса,'
+            ) + '\n999,Новинка,2020,1\n',
+            encoding='utf-8'
+        )
+        review_csv = data_dir / 'review.csv'
+        review_csv.write_text(
+            review_csv.read_text(encoding='utf-8').replace(
+                '1,1,"Ставлю десять звёзд!', '1,2,"Ставлю десять звёзд!'
+            ),
+            encoding='utf-8'
+        )
+        call_command('import_db', data_dir=data_dir, incremental=True)
+
+        assert Title.objects.get(pk=1).name == 'Побег из Алькатраса'
+        assert Title.objects.filter(pk=999).exists()
+        assert list(
+            Title.objects.search('алькатрас').values_list('pk', flat=True)
+        ) == [1]
+        assert Review.objects.get(pk=1).title_id == 2
+        call_command('recount_ratings', check=True)
+
+    def test_03_import_db_parallel(self):
+        from reviews.models import Comment, Review, Title
+
+        call_command('import_db', workers=2, batch_size=10)
+
+        assert Title.objects.count() == 32
+        assert Title.genre.through.objects.count() == 42
+        assert Review.objects.count() == 72
+        assert Comment.objects.count() == 3
+        call_command('recount_ratings', check=True)
+
+    def test_04_dependency_levels(self):
+        from reviews.management.commands.import_db import (
+            LIB, dependency_levels)
+
+        levels = [
+            {table.file_name for table in level}
+            for level in dependency_levels(LIB)
+        ]
+        assert levels == [
+            {'users.csv', 'category.csv', 'genre.csv'},
+            {'titles.csv'},
+            {'genre_title.csv', 'review.csv'},
+            {'comments.csv'},
+        ]
+
+    def test_05_export_db(self, tmp_path):
+        import csv
+        import gzip
+
+        from reviews.csv_reader import parse_csv
+        from reviews.management.commands.import_db import LIB
+
+        call_command('import_db')
+        call_command('export_db', output_dir=tmp_path, snapshot=True)
+        for table in LIB:
+            rows, _, _ = parse_csv(tmp_path / table.file_name, table.columns)
+            assert len(rows) == table.model.objects.count(), (
+                f'Проверьте, что `export_db` выгружает все строки '
+                f'`{table.file_name}` в формате `import_db`.'
+            )
+
+        with open(tmp_path / 'review.csv', encoding='utf-8') as file:
+            first_review = next(csv.DictReader(file))
+        assert first_review['pub_date'] == '2019-09-24T21:08:21.567Z'
+
+        call_command('export_db', output_dir=tmp_path / 'gz', gzip=True)
+        with gzip.open(tmp_path / 'gz' / 'titles.csv.gz', 'rt',
+                       encoding='utf-8') as file:
+            assert len(list(csv.DictReader(file))) == 32
+
+    def test_06_generate_data(self):
+        from reviews.models import Comment, Review, Title
+
+        options = dict(users=30, categories=3, genres=5, titles=20,
+                       reviews=200, comments=100, seed=7)
+        call_command('generate_data', **options)
+        first_run = list(
+            Review.objects.order_by('pk').values_list(
+                'title_id', 'author_id', 'score', 'pub_date')
+        )
+        first_years = list(
+            Title.objects.order_by('pk').values_list('year', flat=True))
+        assert Title.objects.count() == 20
+        assert Comment.objects.count() == 100
+        assert len(first_run) == len(set(
+            (title_id, author_id) for title_id, author_id, *_ in first_run
+        )), 'Проверьте, что генератор соблюдает `unique_title_author`.'
+        call_command('recount_ratings', check=True)
+
+        Comment.objects.all().delete()
+        Review.objects.all().delete()
+        Title.objects.all().delete()
+        call_command('generate_data', **options)
+        second_run = list(
+            Review.objects.order_by('pk').values_list(
+                'title_id', 'author_id', 'score', 'pub_date')
+        )
+        # Пользователи второго запуска получают новые id,
+        # поэтому сравниваются только оценки и даты.
+        assert first_run and [row[2:] for row in second_run] == [
+            row[2:] for row in first_run
+        ], 'Проверьте, что при одинаковом `seed` данные совпадают.'
+        assert list(
+            Title.objects.order_by('pk').values_list('year', flat=True)
+        ) == first_years
+
+    def test_07_counters_single_update(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        from reviews.management.commands.import_db import LIB
+
+        with CaptureQueriesContext(connection) as context:
+            call_command('import_db', batch_size=7)
+        updates = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith((
+                'UPDATE "reviews_title" SET "score_sum"',
+                'UPDATE "reviews_review" SET "comments_count"',
+            ))
+        ]
+        assert len(updates) == 2, (
+            'Проверьте, что рейтинги и число комментариев обновляются '
+            'одним UPDATE на пачку, а не запросом на каждую строку.'
+        )
+        deletes = [
+            query for query in context.captured_queries
+            if query['sql'].startswith(
+                'DELETE FROM "reviews_importrowchecksum"')
+        ]
+        assert len(deletes) == len(LIB), (
+            'Проверьте, что полная загрузка удаляет контрольные суммы '
+            'строк один раз на таблицу, а не для каждой пачки.'
+        )
+        call_command('recount_ratings', check=True)
+
+    def test_08_incremental_recount_in_batches(self, tmp_path, monkeypatch):
+        import csv
+        import shutil
+
+        from django.conf import settings
+
+        from reviews.management.commands import import_db, recount_ratings
+        from reviews.models import Title
+
+        data_dir = tmp_path / 'data'
+        shutil.copytree(settings.BASE_DIR / 'static' / 'data', data_dir)
+        call_command('import_db', data_dir=data_dir)
+        review_csv = data_dir / 'review.csv'
+        with open(review_csv, encoding='utf-8', newline='') as file:
+            reader = csv.DictReader(file)
+            fieldnames, rows = reader.fieldnames, list(reader)
+        with open(review_csv, 'w', encoding='utf-8', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames)
+            writer.writeheader()
+            writer.writerows({**row, 'score': '1'} for row in rows)
+
+        monkeypatch.setattr(import_db, 'DELTA_BATCH_SIZE', 3)
+        monkeypatch.setattr(recount_ratings, 'BATCH_SIZE', 2)
+        call_command('import_db', data_dir=data_dir, incremental=True)
+        ratings = set(Title.objects.filter(
+            reviews_count__gt=0).values_list('rating', flat=True))
+        assert ratings == {1}, (
+            'Проверьте, что `--incremental` пересчитывает рейтинг всех '
+            'затронутых произведений, разбивая их на пачки.'
+        )
+        call_command('recount_ratings', check=True)
+
+    def test_09_incremental_rename_changes_etag(self, client, tmp_path):
+        import shutil
+
+        from django.conf import settings
+
+        data_dir = tmp_path / 'data'
+        shutil.copytree(settings.BASE_DIR / 'static' / 'data', data_dir)
+        call_command('import_db', data_dir=data_dir)
+        url = '/api/v1/titles/1/reviews/'
+        etag = client.get(url)['ETag']
+        users_csv = data_dir / 'users.csv'
+        users_csv.write_text(
+            users_csv.read_text(encoding='utf-8').replace(
+                '100,bingobongo,', '100,bongobingo,'),
+            encoding='utf-8'
+        )
+        call_command('import_db', data_dir=data_dir, incremental=True)
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что переименование автора через `--incremental` '
+            'меняет ETag его отзывов.'
+        )
+        assert 'bongobingo' in {
+            review['author'] for review in response.json()['results']}
+
+    def test_10_integrity_error_hint(self, tmp_path):
+        import shutil
+
+        from django.conf import settings
+        from django.core.management import CommandError
+
+        data_dir = tmp_path / 'data'
+        shutil.copytree(settings.BASE_DIR / 'static' / 'data', data_dir)
+        call_command('import_db', data_dir=data_dir)
+        with pytest.raises(CommandError, match='--incremental'):
+            call_command('import_db', data_dir=data_dir)
+
+        review_csv = data_dir / 'review.csv'
+        review_csv.write_text(
+            review_csv.read_text(encoding='utf-8').rstrip('\n')
+            + '\n999,1,Дубль,100,5,2019-09-24T21:08:21.567Z\n',
+            encoding='utf-8'
+        )
+        with pytest.raises(CommandError) as error:
+            call_command('import_db', data_dir=data_dir, incremental=True)
+        assert '--incremental' not in str(error.value), (
+            'Проверьте, что подсказка про `--incremental` не выводится, '
+            'если импорт уже запущен с этим флагом.'
+        )
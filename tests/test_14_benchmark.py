@@ -0,0 +1,36 @@
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14Benchmark:
+
+    def test_01_run_benchmark(self):
+        from api.management.commands.benchmark import (SCENARIOS,
+                                                       check_coverage,
+                                                       run_benchmark)
+
+        check_coverage(SCENARIOS)
+        results = run_benchmark(
+            sizes=(20,), repeat=2, warmup=1, report=lambda message: None)
+
+        assert set(results['20']) == {
+            scenario.name for scenario in SCENARIOS
+        }, 'Проверьте, что бенчмарк прогоняет все сценарии.'
+        stats = results['20']['titles-list']
+        assert stats['p50_ms'] <= stats['p99_ms']
+        assert stats['queries'] > 0, (
+            'Проверьте, что бенчмарк считает SQL-запросы.'
+        )
+
+    def test_02_compare(self):
+        from api.management.commands.benchmark import compare
+
+        baseline = {'100': {'titles-list': {'p50_ms': 10.0, 'queries': 3}}}
+        same = {'100': {'titles-list': {'p50_ms': 11.0, 'queries': 3}}}
+        slower = {'100': {'titles-list': {'p50_ms': 13.0, 'queries': 4}}}
+
+        assert compare(same, baseline, 0.2) == []
+        assert len(compare(slower, baseline, 0.2)) == 2, (
+            'Проверьте, что регрессией считается рост медианы выше порога '
+            'и рост числа запросов.'
+        )
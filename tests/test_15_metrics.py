@@ -0,0 +1,55 @@
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15Metrics:
+
+    def test_01_metrics_access(self, client, user_client, admin_client):
+        assert client.get('/api/v1/metrics/').status_code == 401
+        assert user_client.get('/api/v1/metrics/').status_code == 403, (
+            'Проверьте, что метрики доступны только администратору.'
+        )
+        response = admin_client.get('/api/v1/metrics/')
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('text/plain')
+
+    def test_02_metrics_content(self, client, admin_client):
+        from api.metrics import registry
+
+        registry.clear()
+        client.get('/api/v1/titles/')
+        client.get('/api/v1/titles/')
+        client.get('/api/v1/titles/1/')
+        content = admin_client.get('/api/v1/metrics/').content.decode()
+
+        assert (
+            'yamdb_request_duration_seconds_count'
+            '{route="titles-list",method="GET"} 2'
+        ) in content, (
+            'Проверьте, что метрики группируются по имени маршрута и методу.'
+        )
+        assert (
+            'yamdb_request_duration_seconds_count'
+            '{route="titles-detail",method="GET"} 1'
+        ) in content
+        assert (
+            'yamdb_request_queries_bucket'
+            '{route="titles-list",method="GET",le="+Inf"} 2'
+        ) in content
+        assert 'yamdb_request_sql_seconds_total{route="titles-list"' in (
+            content
+        ), 'Проверьте, что учитывается время SQL-запросов.'
+
+    def test_03_registry_is_bounded(self):
+        from api.metrics import OTHER, MetricsRegistry
+
+        registry = MetricsRegistry(max_series=3)
+        for number in range(10):
+            registry.observe(f'route-{number}', 'GET', 0.01, 2, 0.001)
+        registry.observe('route-0', 'BREW', 0.01, 2, 0.001)
+
+        assert len(registry.series) == 5, (
+            'Проверьте, что число рядов метрик ограничено.'
+        )
+        assert registry.series[(OTHER, 'GET')].count == 7
+        assert (OTHER, OTHER) in registry.series
@@ -0,0 +1,96 @@
+import json
+
+import pytest
+from django.core.management import call_command
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16SlowQueries:
+
+    def test_01_fingerprint(self):
+        from api.slow_queries import fingerprint, normalize_sql
+
+        assert normalize_sql(
+            "SELECT * FROM t WHERE id IN (%s, %s, %s) AND name = 'x'"
+        ) == 'SELECT * FROM t WHERE id IN (...) AND name = ?'
+        assert fingerprint('SELECT 1 FROM t LIMIT 10') == fingerprint(
+            'SELECT 1 FROM t  LIMIT 20'
+        ), 'Проверьте, что отпечаток не зависит от значений.'
+
+    def test_02_slow_query_log(self, client, settings, tmp_path, capsys):
+        from api.slow_queries import logger, seen
+
+        log_file = tmp_path / 'slow.log'
+        settings.SLOW_QUERY_THRESHOLD_MS = 0
+        settings.SLOW_QUERY_LOG_FILE = log_file
+        seen.items.clear()
+        try:
+            client.get('/api/v1/titles/?genre=drama&category=film')
+            client.get('/api/v1/titles/?genre=comedy&category=book')
+        finally:
+            for handler in logger.handlers[:]:
+                logger.removeHandler(handler)
+                handler.close()
+
+        records = [json.loads(line) for line in log_file.open()]
+        assert records, 'Проверьте, что медленные запросы записываются.'
+        assert {record['view'] for record in records} == {'titles-list'}
+        by_fingerprint = {}
+        for record in records:
+            by_fingerprint.setdefault(record['fingerprint'], []).append(
+                record)
+        repeated = [
+            group for group in by_fingerprint.values() if len(group) > 1]
+        assert repeated, 'Проверьте группировку запросов по отпечатку.'
+        for group in repeated:
+            assert group[0]['plan'] and group[1]['plan'] is None, (
+                'Проверьте, что план снимается один раз на отпечаток.'
+            )
+
+        call_command('slow_queries', file=log_file, top=3)
+        output = capsys.readouterr().out
+        assert 'GET titles-list' in output
+        assert 'План:' in output
+
+    def test_03_only_selects_are_explained(self, admin_client, settings,
+                                           tmp_path):
+        from api.slow_queries import logger, seen
+
+        log_file = tmp_path / 'slow.log'
+        settings.SLOW_QUERY_THRESHOLD_MS = 0
+        settings.SLOW_QUERY_LOG_FILE = log_file
+        seen.items.clear()
+        try:
+            response = admin_client.post(
+                '/api/v1/categories/', data={'name': 'Фильм', 'slug': 'film'})
+        finally:
+            for handler in logger.handlers[:]:
+                logger.removeHandler(handler)
+                handler.close()
+
+        assert response.status_code == 201
+        records = [json.loads(line) for line in log_file.open()]
+        writes = [
+            record for record in records
+            if not record['sql'].lstrip().upper().startswith('SELECT')
+        ]
+        assert writes, 'Не найден изменяющий запрос в журнале.'
+        assert all(record['plan'] is None for record in writes), (
+            'Проверьте, что EXPLAIN выполняется только для SELECT.'
+        )
+
+    def test_04_failed_explain_keeps_transaction(self, rf):
+        from django.db import connection, transaction
+
+        from api.slow_queries import SlowQueryRecorder, seen
+
+        seen.items.clear()
+        recorder = SlowQueryRecorder(rf.get('/'), 0)
+        with transaction.atomic():
+            recorder.record('SELECT * FROM missing_table', (), False, 1)
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+                assert cursor.fetchone() == (1,), (
+                    'Проверьте, что ошибка EXPLAIN не ломает транзакцию '
+                    'запроса.'
+                )
@@ -0,0 +1,88 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17JwtCache:
+
+    def test_01_user_is_cached(self, admin_client):
+        admin_client.get('/api/v1/genres/')
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.get('/api/v1/genres/')
+        assert response.status_code == 200
+        assert not any(
+            'users_user' in query['sql']
+            for query in context.captured_queries
+        ), 'Проверьте, что пользователь из JWT берётся из кеша.'
+
+    def test_02_role_change_invalidates_cache(self, admin_client,
+                                              user_client, user):
+        assert user_client.get('/api/v1/users/').status_code == 403
+        response = admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'role': 'admin'})
+        assert response.status_code == 200
+        assert user_client.get('/api/v1/users/').status_code == 200, (
+            'Проверьте, что смена роли сбрасывает кеш пользователя.'
+        )
+
+    def test_03_delete_invalidates_cache(self, admin_client, user_client,
+                                         user):
+        assert user_client.get('/api/v1/users/me/').status_code == 200
+        response = admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert response.status_code == 204
+        assert user_client.get('/api/v1/users/me/').status_code == 401, (
+            'Проверьте, что удалённый пользователь не проходит '
+            'аутентификацию.'
+        )
+
+    def test_04_me_returns_full_profile(self, user_client, user):
+        user_client.get('/api/v1/users/me/')
+        response = user_client.get('/api/v1/users/me/')
+        assert response.json()['email'] == user.email
+        assert response.json()['bio'] == user.bio
+
+    def test_05_cache_is_forgotten_after_commit(self, user_client, user):
+        from django.core.cache import cache
+        from django.db import transaction
+
+        from users.authentication import identity_cache_key
+
+        user_client.get('/api/v1/users/me/')
+        key = identity_cache_key(user.pk)
+        with transaction.atomic():
+            user.role = 'admin'
+            user.save()
+            assert cache.get(key) is not None, (
+                'Проверьте, что кеш пользователя сбрасывается только '
+                'после фиксации транзакции.'
+            )
+        assert cache.get(key) is None
+
+    def test_06_incremental_import_forgets_users(self, tmp_path):
+        import shutil
+
+        from django.conf import settings
+        from django.core.cache import cache
+        from django.core.management import call_command
+
+        from users.authentication import identity_cache_key
+
+        data_dir = tmp_path / 'data'
+        shutil.copytree(settings.BASE_DIR / 'static' / 'data', data_dir)
+        call_command('import_db', data_dir=data_dir)
+        key = identity_cache_key(100)
+        cache.set(key, ('cached',))
+        users_csv = data_dir / 'users.csv'
+        users_csv.write_text(
+            users_csv.read_text(encoding='utf-8').replace(
+                '100,bingobongo,bingobongo@yamdb.fake,user,',
+                '100,bingobongo,bingobongo@yamdb.fake,admin,'
+            ),
+            encoding='utf-8'
+        )
+        call_command('import_db', data_dir=data_dir, incremental=True)
+        assert cache.get(key) is None, (
+            'Проверьте, что `import_db --incremental` сбрасывает кеш '
+            'изменённых пользователей.'
+        )
@@ -0,0 +1,117 @@
+import pytest
+from django.core import mail
+from django.core.management import call_command
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18EmailOutbox:
+    url_signup = '/api/v1/auth/signup/'
+
+    def test_01_signup_enqueues_email(self, client):
+        from users.models import OutboxEmail
+
+        data = {'email': 'outbox@yamdb.fake', 'username': 'outbox'}
+        response = client.post(self.url_signup, data=data)
+
+        assert response.status_code == 200
+        assert len(mail.outbox) == 0, (
+            'Проверьте, что письмо не отправляется во время запроса.'
+        )
+        email = OutboxEmail.objects.get()
+        assert email.recipients == data['email']
+
+        call_command('send_emails', once=True)
+        assert len(mail.outbox) == 1
+        assert mail.outbox[0].to == [data['email']]
+        email.refresh_from_db()
+        assert email.sent_at is not None, (
+            'Проверьте, что отправленное письмо помечается в очереди.'
+        )
+
+    def test_02_failed_send_is_retried_with_backoff(self, settings):
+        from django.utils import timezone
+
+        from users.models import OutboxEmail
+        from users.outbox import enqueue_email, queue_depth, send_batch
+
+        settings.EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+        settings.EMAIL_HOST = '127.0.0.1'
+        settings.EMAIL_PORT = 1
+        settings.EMAIL_TIMEOUT = 1
+        settings.EMAIL_OUTBOX_MAX_ATTEMPTS = 2
+        enqueue_email('Тема', 'Текст', 'admin@yamdb.ru', ['to@yamdb.fake'])
+
+        assert send_batch() == (0, 1)
+        email = OutboxEmail.objects.get()
+        assert email.attempts == 1 and email.last_error
+        assert email.next_attempt_at > timezone.now(), (
+            'Проверьте, что повторная попытка откладывается.'
+        )
+        assert send_batch() == (0, 0)
+
+        OutboxEmail.objects.update(next_attempt_at=timezone.now())
+        assert send_batch() == (0, 1)
+        assert queue_depth() == {'pending': 0, 'failed': 1}, (
+            'Проверьте, что письмо не отправляется после исчерпания попыток.'
+        )
+
+    def test_03_queue_depth_metric(self, admin_client):
+        from users.outbox import enqueue_email
+
+        enqueue_email('Тема', 'Текст', 'admin@yamdb.ru', ['to@yamdb.fake'])
+        content = admin_client.get('/api/v1/metrics/').content.decode()
+        assert 'yamdb_email_outbox_pending 1' in content
+
+    def test_04_send_outside_transaction(self):
+        from django.db import connection
+
+        from users.models import OutboxEmail
+        from users.outbox import enqueue_email, send_batch
+
+        class FlakyConnection:
+            """Первое письмо уходит, на втором сервер падает."""
+
+            def __init__(self):
+                self.sent = []
+
+            def open(self):
+                pass
+
+            def close(self):
+                pass
+
+            def send_messages(self, messages):
+                assert not connection.in_atomic_block, (
+                    'Проверьте, что письма отправляются без открытой '
+                    'транзакции.'
+                )
+                if self.sent:
+                    raise ConnectionError('сервер недоступен')
+                self.sent.extend(messages)
+
+        for idx in range(2):
+            enqueue_email('Тема', 'Текст', 'admin@yamdb.ru',
+                          [f'to{idx}@yamdb.fake'])
+        assert send_batch(connection=FlakyConnection()) == (1, 1)
+        first, second = OutboxEmail.objects.order_by('id')
+        assert first.sent_at is not None and not first.claim_token, (
+            'Проверьте, что результат каждого письма записывается сразу.'
+        )
+        assert second.sent_at is None and second.attempts == 1
+
+    def test_05_claimed_batch_is_leased(self):
+        from django.utils import timezone
+
+        from users.outbox import claim_batch, enqueue_email
+
+        for idx in range(3):
+            enqueue_email('Тема', 'Текст', 'admin@yamdb.ru',
+                          [f'to{idx}@yamdb.fake'])
+        now = timezone.now()
+        first = claim_batch(2, None, now)
+        second = claim_batch(2, None, now)
+        assert len(first) == 2 and len(second) == 1, (
+            'Проверьте, что забранные письма не достаются другому воркеру.'
+        )
+        assert not {email.pk for email in first} & {
+            email.pk for email in second}
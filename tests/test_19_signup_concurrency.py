@@ -0,0 +1,68 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+URL_SIGNUP = '/api/v1/auth/signup/'
+THREADS = 8
+
+
+def parallel_signups(payloads):
+    def signup(data):
+        try:
+            return APIClient().post(URL_SIGNUP, data=data).status_code
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+        return list(executor.map(signup, payloads))
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19SignupConcurrency:
+
+    def test_01_signup_queries(self, client, django_user_model):
+        data = {'email': 'single@yamdb.fake', 'username': 'single'}
+        client.post(URL_SIGNUP, data=data)
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(URL_SIGNUP, data=data)
+        assert response.status_code == 200
+        lookups = [
+            query for query in context.captured_queries
+            if 'FROM "users_user"' in query['sql']
+        ]
+        assert len(lookups) == 1, (
+            'Проверьте, что повторная регистрация ищет пользователя '
+            'одним запросом.'
+        )
+        assert not any(
+            query['sql'].startswith('UPDATE "users_user"')
+            for query in context.captured_queries
+        )
+
+    def test_02_parallel_same_identity(self, django_user_model):
+        from users.models import OutboxEmail
+
+        data = {'email': 'race@yamdb.fake', 'username': 'race'}
+        statuses = parallel_signups([data] * THREADS)
+
+        assert statuses == [200] * THREADS, (
+            'Проверьте, что параллельные регистрации одного пользователя '
+            'завершаются успешно.'
+        )
+        assert django_user_model.objects.filter(username='race').count() == 1
+        assert OutboxEmail.objects.count() == THREADS
+
+    def test_03_parallel_conflicting_emails(self, django_user_model):
+        statuses = parallel_signups([
+            {'email': f'race{number}@yamdb.fake', 'username': 'race'}
+            for number in range(THREADS)
+        ])
+
+        assert sorted(statuses) == [200] + [400] * (THREADS - 1), (
+            'Проверьте, что из конфликтующих регистраций успешна '
+            'только одна.'
+        )
+        assert django_user_model.objects.filter(username='race').count() == 1
@@ -0,0 +1,61 @@
+from http import HTTPStatus
+
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20Throttling:
+    url_token = '/api/v1/auth/token/'
+    url_signup = '/api/v1/auth/signup/'
+
+    def test_01_token_bucket(self):
+        from api.throttling import take_token
+
+        assert take_token('test', 2, 60, now=1000)[0]
+        assert take_token('test', 2, 60, now=1000)[0]
+        allowed, tokens = take_token('test', 2, 60, now=1001)
+        assert not allowed, 'Проверьте, что пустая корзина не пропускает.'
+        assert take_token('test', 2, 60, now=1031)[0], (
+            'Проверьте, что корзина наполняется со временем.'
+        )
+        assert not take_token('test', 2, 60, now=1031)[0]
+
+    def test_02_username_throttle(self, client, settings, user):
+        settings.REST_FRAMEWORK = {
+            **settings.REST_FRAMEWORK,
+            'DEFAULT_THROTTLE_RATES': {'token_username': '2/min'},
+        }
+        data = {'username': user.username, 'confirmation_code': '0-0'}
+        for _ in range(2):
+            response = client.post(self.url_token, data=data)
+            assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = client.post(self.url_token, data=data)
+
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что подбор кода подтверждения ограничен.'
+        )
+        assert 0 < int(response['Retry-After']) <= 30, (
+            'Проверьте, что ответ содержит заголовок Retry-After.'
+        )
+        other = client.post(
+            self.url_token,
+            data={'username': 'other', 'confirmation_code': '0-0'})
+        assert other.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что лимит считается отдельно для каждого имени.'
+        )
+
+    def test_03_ip_throttle(self, client, settings):
+        settings.REST_FRAMEWORK = {
+            **settings.REST_FRAMEWORK,
+            'DEFAULT_THROTTLE_RATES': {'signup_ip': '3/hour'},
+        }
+        statuses = [
+            client.post(self.url_signup, data={
+                'username': f'flood{number}',
+                'email': f'flood{number}@yamdb.fake',
+            }).status_code
+            for number in range(4)
+        ]
+        assert statuses == [HTTPStatus.OK] * 3 + [
+            HTTPStatus.TOO_MANY_REQUESTS
+        ], 'Проверьте ограничение регистраций с одного IP-адреса.'
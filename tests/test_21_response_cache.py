@@ -0,0 +1,109 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200
+    return response, len(context.captured_queries)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21ResponseCache:
+
+    def test_01_anonymous_reads_are_cached(self, client, admin_client):
+        from reviews.models import Category, Genre, Title
+
+        genre = Genre.objects.create(name='Драма', slug='drama')
+        category = Category.objects.create(name='Фильм', slug='film')
+        title = Title.objects.create(name='Фильм', year=2000,
+                                     category=category)
+        title.genre.add(genre)
+
+        first, _ = count_queries(client, '/api/v1/titles/?limit=5&offset=0')
+        second, queries = count_queries(
+            client, '/api/v1/titles/?offset=0&limit=5')
+        assert queries == 0, (
+            'Проверьте, что повторный анонимный запрос отдаётся из кеша '
+            'независимо от порядка параметров.'
+        )
+        assert second.content == first.content
+        _, queries = count_queries(admin_client, '/api/v1/titles/')
+        assert queries > 0, (
+            'Проверьте, что запросы с токеном не кешируются.'
+        )
+
+    @pytest.mark.parametrize('change', [
+        'title', 'genre', 'category', 'review', 'genres_m2m',
+    ])
+    def test_02_invalidation(self, client, user, change):
+        from reviews.models import Category, Genre, Review, Title
+
+        genre = Genre.objects.create(name='Драма', slug='drama')
+        category = Category.objects.create(name='Фильм', slug='film')
+        title = Title.objects.create(name='Фильм', year=2000,
+                                     category=category)
+        title.genre.add(genre)
+        url = f'/api/v1/titles/{title.id}/'
+        before, _ = count_queries(client, url)
+
+        if change == 'title':
+            title.name = 'Новое название'
+            title.save()
+        elif change == 'genre':
+            genre.name = 'Комедия'
+            genre.save()
+        elif change == 'category':
+            category.name = 'Книга'
+            category.save()
+        elif change == 'review':
+            Review.objects.create(title=title, author=user, text='Отзыв',
+                                  score=7)
+        else:
+            title.genre.add(Genre.objects.create(name='Новый', slug='new'))
+
+        after, queries = count_queries(client, url)
+        assert queries > 0 and after.content != before.content, (
+            f'Проверьте, что изменение ({change}) сбрасывает кеш ответов.'
+        )
+
+    def test_03_genres_list_invalidation(self, client, admin_client):
+        count_queries(client, '/api/v1/genres/')
+        response = admin_client.post(
+            '/api/v1/genres/', data={'name': 'Драма', 'slug': 'drama'})
+        assert response.status_code == 201
+        response, _ = count_queries(client, '/api/v1/genres/')
+        assert response.json()['count'] == 1
+
+    @pytest.mark.parametrize('backend,queries', [
+        ('django.core.cache.backends.filebased.FileBasedCache', 0),
+        # Поколения тегов и сам ответ читаются из таблицы кеша.
+        ('django.core.cache.backends.db.DatabaseCache', 2),
+    ])
+    def test_04_shared_backends(self, client, settings, tmp_path, backend,
+                                queries):
+        from django.core.management import call_command
+
+        from reviews.models import Genre
+
+        is_db = backend.endswith('DatabaseCache')
+        settings.CACHES = {
+            **settings.CACHES,
+            'responses': {
+                'BACKEND': backend,
+                'LOCATION': 'response_cache' if is_db else str(tmp_path),
+            },
+        }
+        if is_db:
+            call_command('createcachetable', 'response_cache')
+
+        count_queries(client, '/api/v1/genres/')
+        _, cached_queries = count_queries(client, '/api/v1/genres/')
+        assert cached_queries == queries, (
+            f'Проверьте кеширование ответов в бэкенде {backend}.'
+        )
+        Genre.objects.create(name='Драма', slug='drama')
+        response, _ = count_queries(client, '/api/v1/genres/')
+        assert response.json()['count'] == 1
@@ -0,0 +1,156 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def conditional_get(client, url, **headers):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url, **headers)
+    return response, len(context.captured_queries)
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.usefixtures('comment')
+class Test22ConditionalGet:
+
+    @pytest.mark.parametrize('url', [
+        '/api/v1/titles/{title_id}/',
+        '/api/v1/titles/{title_id}/reviews/',
+        '/api/v1/titles/{title_id}/reviews/{review_id}/',
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+    ])
+    def test_01_not_modified(self, admin_client, review, url):
+        url = url.format(title_id=review.title_id, review_id=review.id)
+        response = admin_client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert response.has_header('ETag') and response.has_header(
+            'Last-Modified'), (
+            f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+            'заголовки ETag и Last-Modified.'
+        )
+        response, queries = conditional_get(
+            admin_client, url, HTTP_IF_NONE_MATCH=response['ETag'])
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Проверьте, что `{url}` отвечает 304 на If-None-Match '
+            'с актуальным ETag.'
+        )
+        assert queries == 1, (
+            f'Проверьте, что ответ 304 для `{url}` требует одного '
+            f'SQL-запроса, а не {queries}.'
+        )
+        response = admin_client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Проверьте, что `{url}` отвечает 304 на If-Modified-Since.'
+        )
+
+    @pytest.mark.parametrize('url,change', [
+        ('/api/v1/titles/{title_id}/', 'new_review'),
+        ('/api/v1/titles/{title_id}/', 'genre'),
+        ('/api/v1/titles/{title_id}/reviews/', 'new_review'),
+        ('/api/v1/titles/{title_id}/reviews/', 'edit_review'),
+        ('/api/v1/titles/{title_id}/reviews/', 'delete_review'),
+        ('/api/v1/titles/{title_id}/reviews/', 'rename_author'),
+        ('/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+         'edit_comment'),
+    ])
+    def test_02_changes_update_etag(self, admin_client, admin, review,
+                                    url, change):
+        from reviews.models import Genre, Review
+
+        url = url.format(title_id=review.title_id, review_id=review.id)
+        etag = admin_client.get(url)['ETag']
+        if change == 'new_review':
+            Review.objects.create(
+                title=review.title, author=admin, text='Ещё', score=9)
+        elif change == 'genre':
+            review.title.genre.add(
+                Genre.objects.create(name='Комедия', slug='comedy'))
+        elif change == 'edit_review':
+            review.text = 'Исправленный отзыв'
+            review.save()
+        elif change == 'delete_review':
+            Review.objects.create(
+                title=review.title, author=admin, text='Ещё', score=9)
+            etag = admin_client.get(url)['ETag']
+            review.delete()
+        elif change == 'rename_author':
+            review.author.username = 'renamed'
+            review.author.save()
+        else:
+            comment = review.comments.get()
+            comment.text = 'Исправленный комментарий'
+            comment.save()
+
+        response = admin_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что изменение ({change}) меняет ETag `{url}`.'
+        )
+        assert response['ETag'] != etag
+
+    def test_03_etag_depends_on_query(self, admin_client, review):
+        url = f'/api/v1/titles/{review.title_id}/reviews/'
+        etag = admin_client.get(url, {'limit': 1})['ETag']
+        response = admin_client.get(
+            url, {'limit': 2}, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что ETag списка зависит от параметров запроса.'
+        )
+
+    def test_04_missing_objects(self, admin_client, review):
+        for url in (
+            f'/api/v1/titles/{review.title_id + 1}/reviews/',
+            f'/api/v1/titles/{review.title_id}/reviews/{review.id + 1}/',
+            f'/api/v1/titles/{review.title_id + 1}/reviews/'
+            f'{review.id}/comments/',
+        ):
+            response = admin_client.get(url, HTTP_IF_NONE_MATCH='*')
+            assert response.status_code == HTTPStatus.NOT_FOUND, (
+                f'Проверьте, что `{url}` по-прежнему отвечает 404.'
+            )
+
+    def test_05_cached_response(self, client, review):
+        url = f'/api/v1/titles/{review.title_id}/'
+        etag = client.get(url)['ETag']
+        response, queries = conditional_get(
+            client, url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+        assert queries == 0, (
+            'Проверьте, что анонимный запрос с актуальным ETag '
+            'получает 304 из кеша ответов без SQL-запросов.'
+        )
+
+    @pytest.mark.parametrize('url', [
+        '/api/v1/titles/',
+        '/api/v1/titles/{title_id}/reviews/',
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+    ])
+    def test_06_cursor_without_count(self, admin_client, review, url):
+        url = url.format(title_id=review.title_id, review_id=review.id)
+        params = {'cursor': '', 'limit': 1}
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.get(url, params)
+        assert response.status_code == HTTPStatus.OK
+        assert not any(
+            'COUNT(' in query['sql'] for query in context.captured_queries
+        ), (
+            f'Проверьте, что курсорная страница `{url}` не считает '
+            'всю коллекцию.'
+        )
+        etag = response['ETag']
+        response = admin_client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Проверьте, что курсорная страница `{url}` отвечает 304 '
+            'на актуальный ETag.'
+        )
+        # Изменить первый объект каждой из трёх коллекций.
+        review.title.save()
+        review.save()
+        review.comments.get().save()
+        response = admin_client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что изменение объекта страницы `{url}` '
+            'меняет ETag.'
+        )
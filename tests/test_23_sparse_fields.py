@@ -0,0 +1,84 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def get_with_queries(client, url, params):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url, params)
+    return response, '\n'.join(
+        query['sql'] for query in context.captured_queries)
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.usefixtures('comment')
+class Test23SparseFields:
+
+    def test_01_titles_fields(self, client, review):
+        response, sql = get_with_queries(
+            client, '/api/v1/titles/', {'fields': 'id,name,year,rating'})
+        assert response.status_code == HTTPStatus.OK
+        assert set(response.json()['results'][0]) == {
+            'id', 'name', 'year', 'rating'}, (
+            'Проверьте, что `?fields=` оставляет в ответе только '
+            'перечисленные поля.'
+        )
+        assert '"description"' not in sql, (
+            'Проверьте, что не запрошенное описание не читается из базы.'
+        )
+        assert 'reviews_category' not in sql and 'reviews_genre' not in sql, (
+            'Проверьте, что не запрошенные жанры и категория '
+            'не загружаются.'
+        )
+
+    def test_02_titles_omit(self, client, review):
+        response, sql = get_with_queries(
+            client, f'/api/v1/titles/{review.title_id}/',
+            {'omit': 'description'})
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert 'description' not in data, (
+            'Проверьте, что `?omit=` убирает поле из ответа.'
+        )
+        assert data['genre'] == [{'name': 'Драма', 'slug': 'drama'}]
+        assert data['category'] == {'name': 'Фильм', 'slug': 'film'}
+        assert '"description"' not in sql
+
+    @pytest.mark.parametrize('url,params,expected,table', [
+        ('/api/v1/titles/{title_id}/reviews/', {'omit': 'text'},
+         {'id', 'author', 'score', 'pub_date', 'comments_count'},
+         'reviews_review'),
+        ('/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+         {'fields': 'id,author'}, {'id', 'author'}, 'reviews_comment'),
+    ])
+    def test_03_posts(self, client, review, url, params, expected, table):
+        url = url.format(title_id=review.title_id, review_id=review.id)
+        response, sql = get_with_queries(client, url, params)
+        assert response.status_code == HTTPStatus.OK
+        item = response.json()['results'][0]
+        assert set(item) == expected
+        assert f'"{table}"."text"' not in sql, (
+            f'Проверьте, что `{url}` не читает текст, если он не запрошен.'
+        )
+        assert item['author'] in ('TestModerator', 'TestUser')
+
+    def test_04_cursor_pagination(self, client, review, admin):
+        from reviews.models import Review
+
+        Review.objects.create(
+            title=review.title, author=admin, text='Ещё', score=3)
+        url = f'/api/v1/titles/{review.title_id}/reviews/'
+        response = client.get(
+            url, {'cursor': '', 'limit': 1, 'fields': 'id'})
+        assert response.status_code == HTTPStatus.OK
+        response = client.get(response.json()['next'])
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['results'] == [{'id': review.id + 1}]
+
+    def test_05_unknown_field(self, client, review):
+        response = client.get('/api/v1/titles/', {'fields': 'id,secret'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что неизвестное поле в `?fields=` даёт ответ 400.'
+        )
@@ -0,0 +1,69 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+# Управление транзакцией и пересчёт рейтинга сигналом не относятся
+# к чтениям, которые выполняет сам POST.
+IGNORED_PREFIXES = ('BEGIN', 'SAVEPOINT', 'RELEASE SAVEPOINT')
+RATING_UPDATE_PREFIX = 'UPDATE "reviews_title"'
+
+
+def post_statements(client, url, data):
+    client.get('/api/v1/users/me/')
+    with CaptureQueriesContext(connection) as context:
+        response = client.post(url, data=data)
+    return response, [
+        query['sql'] for query in context.captured_queries
+        if not query['sql'].startswith(
+            (*IGNORED_PREFIXES, RATING_UPDATE_PREFIX))
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24ReviewWritePath:
+
+    def test_01_post_statements(self, user_client):
+        from reviews.models import Category, Title
+
+        category = Category.objects.create(name='Фильм', slug='film')
+        title = Title.objects.create(name='Фильм', year=2000,
+                                     category=category)
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        response, statements = post_statements(
+            user_client, url, {'text': 'Отзыв', 'score': 7})
+        assert response.status_code == HTTPStatus.CREATED
+        assert len(statements) <= 2, (
+            'Проверьте, что создание отзыва выполняет не больше двух '
+            'SQL-запросов (поиск произведения и вставку), а не '
+            f'{len(statements)}:\n' + '\n'.join(statements)
+        )
+        title.refresh_from_db()
+        assert title.rating == 7
+
+    def test_02_duplicate_review(self, user_client):
+        from reviews.models import Category, Review, Title
+
+        category = Category.objects.create(name='Фильм', slug='film')
+        title = Title.objects.create(name='Фильм', year=2000,
+                                     category=category)
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        user_client.post(url, data={'text': 'Отзыв', 'score': 7})
+        response = user_client.post(url, data={'text': 'Ещё', 'score': 1})
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что второй отзыв автора на произведение '
+            'отклоняется с кодом 400.'
+        )
+        assert response.json() == {
+            'non_field_errors': ['Можно оставить только один отзыв.']}
+        title.refresh_from_db()
+        assert Review.objects.count() == 1
+        assert (title.rating, title.reviews_count) == (7, 1), (
+            'Проверьте, что отклонённый отзыв не меняет рейтинг.'
+        )
+
+    def test_03_missing_title(self, user_client):
+        response = user_client.post(
+            '/api/v1/titles/1/reviews/', data={'text': 'Отзыв', 'score': 7})
+        assert response.status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,60 @@
+from http import HTTPStatus
+from types import SimpleNamespace
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.fixture
+def titles():
+    from reviews.models import Category, Title
+
+    category = Category.objects.create(name='Фильм', slug='film')
+    return [
+        Title.objects.create(name=f'Фильм {idx}', year=2000,
+                             category=category)
+        for idx in range(2)
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25NestedListings:
+
+    def test_01_empty_lists(self, client, user, titles):
+        from reviews.models import Review
+
+        review = Review.objects.create(
+            title=titles[0], author=user, text='Отзыв', score=5)
+        for url, status in (
+            (f'/api/v1/titles/{titles[1].id}/reviews/', HTTPStatus.OK),
+            (f'/api/v1/titles/{titles[1].id + 1}/reviews/',
+             HTTPStatus.NOT_FOUND),
+            (f'/api/v1/titles/{titles[0].id}/reviews/{review.id}/comments/',
+             HTTPStatus.OK),
+            (f'/api/v1/titles/{titles[1].id}/reviews/{review.id}/comments/',
+             HTTPStatus.NOT_FOUND),
+        ):
+            response = client.get(url)
+            assert response.status_code == status, (
+                f'Проверьте, что GET-запрос к `{url}` возвращает {status}.'
+            )
+            if status == HTTPStatus.OK:
+                assert response.json()['results'] == []
+
+    def test_02_permission_does_not_load_author(self, user, titles):
+        from api.permissions import IsAuthorActionOrAdminOrModeratorOrReadOnly
+        from reviews.models import Review
+
+        Review.objects.create(
+            title=titles[0], author=user, text='Отзыв', score=5)
+        review = Review.objects.only('pk', 'author_id').get()
+        request = SimpleNamespace(method='PATCH', user=user)
+        with CaptureQueriesContext(connection) as context:
+            allowed = IsAuthorActionOrAdminOrModeratorOrReadOnly(
+            ).has_object_permission(request, None, review)
+        assert allowed
+        assert not context.captured_queries, (
+            'Проверьте, что проверка прав автора сравнивает author_id '
+            'и не загружает пользователя.'
+        )
@@ -0,0 +1,89 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import CommandError, call_command
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26Counters:
+
+    def test_01_comments_count(self, user_client, admin_client, review):
+        url = (f'/api/v1/titles/{review.title_id}/reviews/'
+               f'{review.id}/comments/')
+        ids = [
+            user_client.post(url, data={'text': f'Комментарий {idx}'}).json()[
+                'id']
+            for idx in range(3)
+        ]
+        response = user_client.get(
+            f'/api/v1/titles/{review.title_id}/reviews/')
+        assert response.json()['results'][0]['comments_count'] == 3, (
+            'Проверьте, что отзыв в списке содержит число комментариев.'
+        )
+        user_client.delete(f'{url}{ids[0]}/')
+        response = user_client.get(
+            f'/api/v1/titles/{review.title_id}/reviews/{review.id}/')
+        assert response.json()['comments_count'] == 2, (
+            'Проверьте, что удаление комментария уменьшает счётчик.'
+        )
+        response = admin_client.get(f'/api/v1/titles/{review.title_id}/')
+        assert response.json()['reviews_count'] == 1, (
+            'Проверьте, что произведение содержит число отзывов.'
+        )
+
+    def test_02_cascades(self, user, admin, review):
+        from reviews.models import Comment, Review
+
+        Comment.objects.create(review=review, author=user, text='Первый')
+        Comment.objects.create(review=review, author=admin, text='Второй')
+        user.delete()
+        review.refresh_from_db()
+        assert review.comments_count == 1, (
+            'Проверьте, что каскадное удаление комментариев вместе '
+            'с автором уменьшает счётчик отзыва.'
+        )
+        other = Review.objects.create(
+            title=review.title, author=admin, text='Ещё', score=3)
+        Comment.objects.create(review=other, author=admin, text='Третий')
+        review.delete()
+        other.refresh_from_db()
+        assert other.comments_count == 1
+        assert other.title.reviews_count == 1
+        call_command('recount_ratings', check=True)
+
+    def test_03_recount(self, user, review):
+        from reviews.models import Comment, Review
+
+        Comment.objects.create(review=review, author=user, text='Первый')
+        Review.objects.filter(pk=review.pk).update(comments_count=5)
+        call_command('recount_ratings')
+        review.refresh_from_db()
+        assert review.comments_count == 1, (
+            'Проверьте, что команда `recount_ratings` исправляет '
+            'число комментариев.'
+        )
+
+    def test_04_comment_changes_review_etag(self, admin_client, user,
+                                            review):
+        from reviews.models import Comment
+
+        url = f'/api/v1/titles/{review.title_id}/reviews/'
+        etag = admin_client.get(url)['ETag']
+        Comment.objects.create(review=review, author=user, text='Новый')
+        response = admin_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что новый комментарий меняет ETag списка отзывов.'
+        )
+
+    def test_05_recount_fixes_rating(self, review):
+        from reviews.models import Title
+
+        Title.objects.filter(pk=review.title_id).update(rating=9)
+        with pytest.raises(CommandError):
+            call_command('recount_ratings', check=True)
+        call_command('recount_ratings')
+        review.title.refresh_from_db()
+        assert review.title.rating == 5, (
+            'Проверьте, что команда `recount_ratings` исправляет рейтинг, '
+            'даже если сумма оценок и число отзывов верны.'
+        )
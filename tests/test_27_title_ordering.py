@@ -0,0 +1,117 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.fixture
+def titles(user, moderator, admin):
+    from reviews.models import Category, Review, Title
+
+    films = Category.objects.create(name='Фильм', slug='film')
+    books = Category.objects.create(name='Книга', slug='book')
+    titles = [
+        Title.objects.create(name=name, year=year, category=category)
+        for name, year, category in (
+            ('Б', 2001, films),
+            ('А', 2000, books),
+            ('В', 2001, films),
+            ('А', 1999, films),
+        )
+    ]
+    for title, score in zip(titles, (8, 8, 3)):
+        Review.objects.create(
+            title=title, author=user, text='Отзыв', score=score)
+    return [title.id for title in titles]
+
+
+def page_plans(client, params):
+    """Вернуть id произведений страницы и планы её SQL-запросов."""
+    with CaptureQueriesContext(connection) as context:
+        response = client.get('/api/v1/titles/', params)
+    assert response.status_code == 200
+    plans = []
+    with connection.cursor() as cursor:
+        for query in context.captured_queries:
+            if 'ORDER BY' in query['sql'] and 'reviews_title' in query['sql']:
+                cursor.execute('EXPLAIN QUERY PLAN ' + query['sql'])
+                plans.append(' '.join(row[-1] for row in cursor.fetchall()))
+    return [item['id'] for item in response.json()['results']], plans
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27TitleOrdering:
+
+    @pytest.mark.parametrize('ordering,expected', [
+        (None, (0, 1, 2, 3)),
+        ('rating', (3, 2, 0, 1)),
+        ('-rating', (1, 0, 2, 3)),
+        ('year', (3, 1, 0, 2)),
+        ('-year', (2, 0, 1, 3)),
+        ('name', (1, 3, 0, 2)),
+        ('-id', (3, 2, 1, 0)),
+    ])
+    def test_01_ordering(self, client, titles, ordering, expected):
+        params = {} if ordering is None else {'ordering': ordering}
+        ids, _ = page_plans(client, params)
+        assert ids == [titles[index] for index in expected], (
+            f'Проверьте сортировку `?ordering={ordering}` и то, что '
+            'равные значения упорядочены по id.'
+        )
+
+    @pytest.mark.skipif(
+        connection.vendor != 'sqlite', reason='План запроса SQLite')
+    @pytest.mark.parametrize('params', [
+        {'ordering': 'rating'},
+        {'ordering': '-rating'},
+        {'ordering': 'name'},
+        {'ordering': '-year'},
+        {'ordering': 'year', 'category': 'film'},
+        {'ordering': '-rating', 'category': 'film'},
+    ])
+    def test_02_index_scan(self, client, titles, params):
+        _, plans = page_plans(client, {**params, 'limit': 2})
+        assert plans, 'Не найден запрос страницы произведений.'
+        for plan in plans:
+            assert 'TEMP B-TREE' not in plan, (
+                f'Проверьте, что сортировка {params} читает индекс, '
+                f'а не сортирует строки: {plan}'
+            )
+
+    @pytest.mark.parametrize('ordering', ['rating', '-rating', 'name'])
+    def test_03_cursor_ignores_ordering(self, client, titles, ordering):
+        from reviews.models import Title
+
+        Title.objects.bulk_create(
+            Title(name=f'Без оценок {idx}', year=2000) for idx in range(2))
+        expected = list(Title.objects.order_by('id').values_list(
+            'id', flat=True))
+        ids = []
+        url = '/api/v1/titles/'
+        params = {'cursor': '', 'limit': 2, 'ordering': ordering}
+        while url:
+            response = client.get(url, params)
+            assert response.status_code == 200, (
+                f'Проверьте курсорную пагинацию с `?ordering={ordering}`.'
+            )
+            ids += [item['id'] for item in response.json()['results']]
+            url, params = response.json()['next'], {}
+        assert ids == expected, (
+            'Проверьте, что курсор обходит все произведения по id, '
+            'в том числе без рейтинга, независимо от `?ordering=`.'
+        )
+
+    def test_04_invalid_ordering_keeps_relevance(self, client):
+        from reviews.models import Title
+
+        Title.objects.create(
+            name='Матрица', year=1999,
+            description='Продолжение истории, снятое через много лет')
+        Title.objects.create(name='Матрица', year=1999)
+        relevance, _ = page_plans(client, {'search': 'матрица'})
+        ids, _ = page_plans(
+            client, {'search': 'матрица', 'ordering': 'bogus'})
+        assert relevance != sorted(relevance)
+        assert ids == relevance, (
+            'Проверьте, что `?ordering=` без допустимых полей не заменяет '
+            'сортировку по релевантности поиска.'
+        )
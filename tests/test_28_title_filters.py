@@ -0,0 +1,94 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.fixture
+def titles(user):
+    from reviews.models import Category, Genre, Review, Title
+
+    films = Category.objects.create(name='Фильм', slug='film')
+    books = Category.objects.create(name='Книга', slug='book')
+    music = Category.objects.create(name='Музыка', slug='music')
+    drama = Genre.objects.create(name='Драма', slug='drama')
+    comedy = Genre.objects.create(name='Комедия', slug='comedy')
+    rock = Genre.objects.create(name='Рок', slug='rock')
+    titles = []
+    for name, year, category, genres, score in (
+        ('Первое', 1990, films, (drama, comedy), 9),
+        ('Второе', 2000, films, (drama,), 5),
+        ('Третье', 2010, books, (comedy,), 2),
+        ('Четвёртое', 2020, music, (rock,), None),
+    ):
+        title = Title.objects.create(name=name, year=year, category=category)
+        title.genre.set(genres)
+        if score is not None:
+            Review.objects.create(
+                title=title, author=user, text='Отзыв', score=score)
+        titles.append(title.id)
+    return titles
+
+
+def filtered(client, params):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get('/api/v1/titles/', params)
+    assert response.status_code == 200
+    data = response.json()
+    return (
+        [item['id'] for item in data['results']], data['count'],
+        [query['sql'] for query in context.captured_queries],
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test28TitleFilters:
+
+    @pytest.mark.parametrize('params,expected', [
+        ({'year_min': 2000}, (1, 2, 3)),
+        ({'year_max': 2000}, (0, 1)),
+        ({'year_min': 1995, 'year_max': 2015}, (1, 2)),
+        ({'rating_min': 5}, (0, 1)),
+        ({'rating_max': 5}, (1, 2)),
+        ({'category': 'film,book'}, (0, 1, 2)),
+        ({'genre': 'drama,comedy'}, (0, 1, 2)),
+        ({'genre': 'drama,comedy', 'genre_mode': 'any'}, (0, 1, 2)),
+        ({'genre': 'drama,comedy', 'genre_mode': 'all'}, (0,)),
+        ({'genre': 'drama,rock', 'genre_mode': 'all'}, ()),
+        ({'genre': 'comedy', 'category': 'book', 'year_min': 2000}, (2,)),
+    ])
+    def test_01_filters(self, client, titles, params, expected):
+        ids, count, _ = filtered(client, params)
+        assert ids == [titles[index] for index in expected], (
+            f'Проверьте фильтрацию произведений по {params}.'
+        )
+        assert count == len(expected), (
+            f'Проверьте, что count для {params} не учитывает дубликаты.'
+        )
+
+    def test_02_invalid_genre_mode(self, client, titles):
+        response = client.get(
+            '/api/v1/titles/', {'genre': 'drama', 'genre_mode': 'some'})
+        assert response.status_code == 400
+
+    @pytest.mark.skipif(
+        connection.vendor != 'sqlite', reason='План запроса SQLite')
+    @pytest.mark.parametrize('genre_mode', ['any', 'all'])
+    def test_03_semi_join(self, client, titles, genre_mode):
+        _, _, queries = filtered(
+            client, {'genre': 'drama,comedy', 'genre_mode': genre_mode})
+        page_queries = [
+            sql for sql in queries
+            if 'reviews_title_genre' in sql and 'LIMIT' in sql
+        ]
+        assert page_queries, 'Не найден запрос страницы произведений.'
+        with connection.cursor() as cursor:
+            for sql in page_queries:
+                assert 'DISTINCT' not in sql.upper(), (
+                    'Проверьте, что фильтр по жанрам обходится без DISTINCT.'
+                )
+                cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+                plan = ' '.join(row[-1] for row in cursor.fetchall())
+                assert 'title_genre_genre_title_idx' in plan, (
+                    'Проверьте, что подзапрос по жанрам читает индекс '
+                    f'(genre_id, title_id): {plan}'
+                )